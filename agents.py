@@ -30,7 +30,8 @@ planner_agent = LlmAgent(
     name="PlannerAgent",
     model="gemini-2.0-flash",
     instruction="""You are a web agent planner. Your goal is to help a user achieve a task on a webpage.
-    Based on the user's goal and the current HTML content of the page, decide the single next action to take.
+    Based on the user's goal and a compact observation of the current page, decide the single next action to take.
+    The observation lists the page's interactive elements with ids like [e12], followed by its visible text.
     
     Your available actions are:
     1. `use_browser_and_get_content(url)`: To navigate to a new page.
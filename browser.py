@@ -0,0 +1,287 @@
+# in remo-backend/browser.py
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+# Upper bound on pages open at once across all agent sessions, and how long a
+# caller may wait in line for a free slot before giving up.
+MAX_CONCURRENT_PAGES = int(os.getenv("BROWSER_MAX_CONCURRENT_PAGES", "4"))
+PAGE_WAIT_TIMEOUT_SECONDS = float(os.getenv("BROWSER_PAGE_WAIT_TIMEOUT", "30"))
+
+# Request blocking for agent navigation. BROWSER_LOAD_MODE picks a preset:
+#   full - load everything, like a normal browser
+#   fast - skip images, media, fonts and known ad/analytics domains (default)
+#   text - like fast, but also skip stylesheets (fastest; visibility checks in
+#          the observation become less accurate without CSS)
+# BROWSER_BLOCK_RESOURCE_TYPES / BROWSER_BLOCK_DOMAINS (comma-separated)
+# override the preset's lists.
+LOAD_MODE = os.getenv("BROWSER_LOAD_MODE", "fast")
+LOAD_MODE_RESOURCE_TYPES = {
+    "full": [],
+    "fast": ["image", "media", "font"],
+    "text": ["image", "media", "font", "stylesheet"],
+}
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "googleadservices.com", "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io",
+    "segment.com", "mixpanel.com", "amplitude.com", "adnxs.com", "criteo.com", "taboola.com",
+    "outbrain.com", "scorecardresearch.com", "quantserve.com", "newrelic.com", "nr-data.net",
+]
+
+
+def _csv_env(name: str) -> list[str] | None:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+class BlockPolicy:
+    """Decides which requests an agent page is allowed to make."""
+
+    def __init__(self, resource_types: list[str] | None = None, domains: list[str] | None = None):
+        self.resource_types = set(resource_types or [])
+        self.domains = [d.lower().lstrip(".") for d in (domains or [])]
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+
+    @classmethod
+    def for_mode(cls, mode: str) -> "BlockPolicy":
+        if mode not in LOAD_MODE_RESOURCE_TYPES:
+            raise ValueError(f"Unknown browser load mode '{mode}'; expected one of {list(LOAD_MODE_RESOURCE_TYPES)}.")
+        return cls(LOAD_MODE_RESOURCE_TYPES[mode], [] if mode == "full" else TRACKER_DOMAINS)
+
+    @classmethod
+    def from_env(cls) -> "BlockPolicy":
+        preset = cls.for_mode(LOAD_MODE)
+        resource_types = _csv_env("BROWSER_BLOCK_RESOURCE_TYPES")
+        domains = _csv_env("BROWSER_BLOCK_DOMAINS")
+        return cls(
+            resource_types if resource_types is not None else preset.resource_types,
+            domains if domains is not None else preset.domains,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.domains)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        host = (urlsplit(url).hostname or "").lower()
+        return any(host == d or host.endswith("." + d) for d in self.domains)
+
+    @staticmethod
+    def _is_main_frame_navigation(request) -> bool:
+        # Iframes are "document" requests too, and ad/tracker iframes are the
+        # heaviest third-party loads, so only the top-level page is exempt.
+        try:
+            return request.is_navigation_request() and request.frame.parent_frame is None
+        except Exception:
+            return False  # service worker requests have no frame
+
+    async def handle_route(self, route):
+        request = route.request
+        # Never block the page we were asked to load.
+        if not self._is_main_frame_navigation(request) and self.blocks(request.resource_type, request.url):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+
+    def stats(self) -> dict:
+        return {
+            "blocked_resource_types": sorted(self.resource_types),
+            "blocked_domains": len(self.domains),
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+        }
+
+
+class BrowserBusyError(Exception):
+    """Raised when no page slot frees up within the wait timeout."""
+
+
+class BrowserManager:
+    """
+    Owns one long-lived Chromium, shared by many sessions.
+
+    The browser is launched once (from the app lifespan, or lazily on first use)
+    and every agent session gets its own isolated BrowserContext, so cookies and
+    storage never leak between sessions. If Chromium crashes or disconnects, the
+    next request relaunches it.
+
+    Pages are handed out through `page()`, which caps how many are open at once;
+    callers beyond the cap wait in a FIFO queue for up to `wait_timeout` seconds.
+    Every context applies `block_policy` to its requests. Managers can share
+    one `slots` semaphore to enforce a single cap across several browsers.
+    """
+
+    def __init__(self, headless: bool = True, max_pages: int = MAX_CONCURRENT_PAGES,
+                 wait_timeout: float = PAGE_WAIT_TIMEOUT_SECONDS, block_policy: BlockPolicy | None = None,
+                 slots: asyncio.Semaphore | None = None, name: str = "Browser Manager"):
+        self.name = name
+        self.headless = headless
+        self.block_policy = block_policy if block_policy is not None else BlockPolicy.from_env()
+        self.max_pages = max_pages
+        self.wait_timeout = wait_timeout
+        self._slots = slots if slots is not None else asyncio.Semaphore(max_pages)
+        self._waiting = 0
+        self._active = 0
+        self._metrics = {
+            "slots_acquired": 0,
+            "pages_opened": 0,
+            "wait_timeouts": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._contexts: dict[str, BrowserContext] = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def stop(self):
+        async with self._lock:
+            for context in list(self._contexts.values()):
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._contexts.clear()
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        print(f"--- {self.name}: Chromium stopped. ---")
+
+    async def _ensure_browser(self) -> Browser:
+        # Caller must hold self._lock.
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        if self._browser is not None:
+            print(f"--- {self.name}: Chromium disconnected, relaunching. ---")
+        self._contexts.clear()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._browser.on("disconnected", self._on_disconnected)
+        print(f"--- {self.name}: Chromium launched (headless={self.headless}). ---")
+        return self._browser
+
+    def _on_disconnected(self, browser: Browser):
+        if browser is self._browser:
+            print(f"[WARNING] {self.name}: Chromium exited unexpectedly.")
+            # Contexts die with the browser; drop them so they get recreated.
+            self._contexts.clear()
+
+    async def context_for(self, session_id: str, block_policy: BlockPolicy | None = None) -> BrowserContext:
+        """
+        Returns the session's BrowserContext, creating it (and the browser) if
+        needed. A new context applies `block_policy` if given, else the
+        manager's; an existing context keeps the policy it was created with.
+        """
+        async with self._lock:
+            browser = await self._ensure_browser()
+            context = self._contexts.get(session_id)
+            if context is None:
+                policy = block_policy if block_policy is not None else self.block_policy
+                context = await browser.new_context()
+                if policy.enabled:
+                    await context.route("**/*", policy.handle_route)
+                self._contexts[session_id] = context
+            return context
+
+    async def release(self, session_id: str):
+        """Closes the session's BrowserContext, if it has one."""
+        async with self._lock:
+            context = self._contexts.pop(session_id, None)
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def page(self, session_id: str, block_policy: BlockPolicy | None = None):
+        """
+        Opens a page in the session's context once a slot is free, and closes it
+        when the block exits. Raises BrowserBusyError if the wait times out.
+        `block_policy` is passed to `context_for()`.
+        """
+        self._waiting += 1
+        self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._waiting)
+        wait_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            self._metrics["wait_timeouts"] += 1
+            raise BrowserBusyError(f"No browser page available after {self.wait_timeout:.0f}s; too many concurrent sessions.")
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - wait_start
+        self._metrics["slots_acquired"] += 1
+        self._metrics["total_wait_seconds"] += waited
+        self._metrics["max_wait_seconds"] = max(self._metrics["max_wait_seconds"], waited)
+
+        self._active += 1
+        page: Page | None = None
+        try:
+            context = await self.context_for(session_id, block_policy)
+            page = await context.new_page()
+            self._metrics["pages_opened"] += 1
+            yield page
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Current pool usage and wait-time metrics."""
+        acquired = self._metrics["slots_acquired"]
+        return {
+            "max_pages": self.max_pages,
+            "active_pages": self._active,
+            "queue_depth": self._waiting,
+            "sessions": len(self._contexts),
+            "browser_connected": self._browser is not None and self._browser.is_connected(),
+            **self._metrics,
+            "requests": self.block_policy.stats(),
+            "avg_wait_seconds": self._metrics["total_wait_seconds"] / acquired if acquired else 0.0,
+        }
+
+
+browser_manager = BrowserManager(name="Agent Browser")
+
+# Recording sessions get their own browsers (headed and headless, each
+# launched on first use) with nothing blocked, since the user must see the
+# real page. One cap covers both, so a host never runs more than
+# RECORDER_MAX_SESSIONS recordings at once.
+MAX_RECORDING_SESSIONS = int(os.getenv("RECORDER_MAX_SESSIONS", "8"))
+RECORDING_WAIT_TIMEOUT_SECONDS = float(os.getenv("RECORDER_SESSION_WAIT_TIMEOUT", "5"))
+_recording_slots = asyncio.Semaphore(MAX_RECORDING_SESSIONS)
+recording_browsers = {
+    mode: BrowserManager(
+        headless=(mode == "headless"), max_pages=MAX_RECORDING_SESSIONS, wait_timeout=RECORDING_WAIT_TIMEOUT_SECONDS,
+        block_policy=BlockPolicy(), slots=_recording_slots, name=f"Recording Browser ({mode})",
+    )
+    for mode in ("headed", "headless")
+}
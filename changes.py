@@ -0,0 +1,63 @@
+# in remo-backend/changes.py
+
+import asyncio
+import os
+from contextlib import contextmanager
+
+# Events a subscriber may fall behind by before its queue is dropped and it is
+# told to resync through the delta endpoint instead.
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "256"))
+HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+
+
+class ChangeHub:
+    """
+    In-process pub/sub for task changes, keyed by user id. Write paths call
+    `publish()` after their transaction commits; each open change feed holds
+    a bounded queue from `subscribe()`. Publishing never blocks: a subscriber
+    whose queue is full loses its backlog and gets a single `resync` event.
+    Everything runs on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.counters = {"published": 0, "delivered": 0, "resyncs": 0}
+
+    @contextmanager
+    def subscribe(self, user_id: str):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id: str | None = None) -> bool:
+        return user_id in self._subscribers if user_id is not None else bool(self._subscribers)
+
+    def publish(self, user_id: str, event: dict):
+        self.counters["published"] += 1
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+                self.counters["delivered"] += 1
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+                self.counters["resyncs"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            **self.counters,
+        }
+
+
+change_hub = ChangeHub()
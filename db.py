@@ -0,0 +1,178 @@
+# in remo-backend/db.py
+
+import asyncio
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Pragmas applied to every pooled connection. WAL lets readers run alongside the
+# single writer, and synchronous=NORMAL is durable enough under WAL while
+# skipping the fsync on every commit.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,  # 256 MB memory-mapped I/O
+    "cache_size": -16000,  # negative = KiB, so ~16 MB page cache per connection
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms to wait on a locked database before failing
+}
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of long-lived SQLite connections.
+
+    Connections are opened once by `open()` (called from the app lifespan) and
+    closed by `close()`. Callers check one out with `with pool.connection() as db:`;
+    a checked-out connection belongs to that caller (thread or task) alone until
+    the block exits and it goes back to the pool.
+    """
+
+    def __init__(self, db_name: str, size: int = 8, timeout: float = 10.0):
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self._idle: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._all: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: a connection may be checked out by different
+        # threads over its lifetime, but never by two at once.
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def open(self):
+        """Opens every connection in the pool. Safe to call more than once."""
+        if self._all:
+            return
+        for _ in range(self.size):
+            conn = self._connect()
+            self._all.append(conn)
+            self._idle.put(conn)
+        print(f"DB: Opened pool of {self.size} connections to '{self.db_name}' (WAL).")
+
+    def close(self):
+        """Closes every connection, including any that are still checked out."""
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+        print(f"DB: Closed connection pool for '{self.db_name}'.")
+
+    @contextmanager
+    def connection(self):
+        """Checks out a connection for the duration of the `with` block."""
+        if not self._all:
+            raise RuntimeError("Connection pool is not open.")
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Timed out waiting for a database connection ({self.timeout}s).")
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a connection with a half-finished
+            # transaction or a leftover row factory.
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            self._idle.put(conn)
+
+
+class AsyncDatabase:
+    """
+    Async front-end for the pool so handlers never block the event loop.
+
+    Reads run on a small thread pool, each with a pooled connection. Writes are
+    serialized onto one dedicated writer thread with its own connection, which
+    matches SQLite's single-writer model and avoids SQLITE_BUSY churn between
+    concurrent writers. Every call takes a plain function `fn(db, *args)`; for
+    writes, the transaction is committed when `fn` returns and rolled back if
+    it raises.
+    """
+
+    def __init__(self, db_name: str, pool_size: int = 8):
+        self.pool = ConnectionPool(db_name, size=pool_size)
+        self._readers: ThreadPoolExecutor | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        self._writer_conn: sqlite3.Connection | None = None
+
+    def open(self):
+        self.pool.open()
+        if self._writer is None:
+            self._readers = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="db-reader")
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            self._writer_conn = self.pool._connect()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._readers.shutdown(wait=True)
+            self._writer_conn.close()
+            self._readers = self._writer = self._writer_conn = None
+        self.pool.close()
+
+    def _run_read(self, fn, args):
+        with self.pool.connection() as conn:
+            return fn(conn, *args)
+
+    def _run_write(self, fn, args, on_commit, loop):
+        conn = self._writer_conn
+        try:
+            result = fn(conn, *args)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        if on_commit is not None:
+            # Scheduled from the single writer thread, so callbacks reach the
+            # loop in commit order.
+            loop.call_soon_threadsafe(on_commit, result)
+        return result
+
+    async def read(self, fn, *args):
+        """Runs `fn(db, *args)` on a reader thread and returns its result."""
+        if self._readers is None:
+            raise RuntimeError("Database is not open.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, fn, args)
+
+    async def write(self, fn, *args, on_commit=None):
+        """
+        Runs `fn(db, *args)` in a transaction on the writer thread. If given,
+        `on_commit(result)` is called on the event loop after the commit, in
+        commit order across all writes.
+        """
+        if self._writer is None:
+            raise RuntimeError("Database is not open.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._run_write, fn, args, on_commit, loop)
+
+
+def migrate(db: sqlite3.Connection, migrations: list[tuple]):
+    """
+    Applies every migration newer than the database's `PRAGMA user_version`.
+
+    `migrations` is an ordered list of `(version, description, step)` tuples
+    where `step(db)` performs the change. Each step runs in its own transaction
+    together with the version bump, so a failed step leaves the schema at the
+    previous version.
+    """
+    current = db.execute("PRAGMA user_version").fetchone()[0]
+    for version, description, step in migrations:
+        if version <= current:
+            continue
+        print(f"DB: Applying migration {version}: {description}")
+        db.execute("BEGIN")
+        try:
+            step(db)
+            db.execute(f"PRAGMA user_version = {version}")
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+    return db.execute("PRAGMA user_version").fetchone()[0]
@@ -0,0 +1,44 @@
+# in remo-backend/ids.py
+
+import os
+import time
+from datetime import datetime, timezone
+
+# ULIDs: 48 bits of Unix milliseconds followed by 80 random bits, written as
+# 26 Crockford base32 characters. They sort lexically in creation order (to
+# the millisecond), so new rows land at the right-hand edge of the primary-key
+# B-tree, and an id range is also a creation-time range. Nothing is shared
+# between calls, so any thread or worker process can mint them without a lock.
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+RANDOM_BITS = 80
+TASK_ID_PREFIX = "task_"
+
+
+def _encode(value: int) -> str:
+    return "".join(CROCKFORD_BASE32[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def ulid(when: datetime | None = None) -> str:
+    ms = int((when.timestamp() if when is not None else time.time()) * 1000)
+    return _encode((ms << RANDOM_BITS) | int.from_bytes(os.urandom(RANDOM_BITS // 8), "big"))
+
+
+def ulid_floor(when: datetime) -> str:
+    """The smallest ULID minted at `when`; `id >= ulid_floor(t)` selects ids created at or after t."""
+    return _encode(int(when.timestamp() * 1000) << RANDOM_BITS)
+
+
+def ulid_time(value: str) -> datetime:
+    ms = 0
+    for char in value.upper():
+        ms = (ms << 5) | CROCKFORD_BASE32.index(char)
+    return datetime.fromtimestamp((ms >> RANDOM_BITS) / 1000, tz=timezone.utc)
+
+
+def new_task_id(created: datetime | None = None) -> str:
+    """A task id that sorts by `created` (default: now)."""
+    return TASK_ID_PREFIX + ulid(created)
+
+
+def task_id_floor(when: datetime) -> str:
+    return TASK_ID_PREFIX + ulid_floor(when)
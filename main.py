@@ -1,15 +1,19 @@
 # in remo-backend/main.py
 
 import os
-import sqlite3
 import json
+import asyncio
+import base64
+import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, HTTPException
-from pydantic import BaseModel
+from fastapi import Body, FastAPI, Query, Request, WebSocket, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Literal
+from pydantic import BaseModel, Field, ValidationError
 import firebase_admin
-from firebase_admin import credentials, messaging
+from firebase_admin import credentials
 from fastapi_utilities import repeat_every
 
 from google.adk.runners import Runner
@@ -17,6 +21,21 @@ from google.adk.sessions import InMemorySessionService
 from google.genai.types import Content, Part
 from agents import thinker_agent, browser_agent  # Import our agents
 from tools import start_interactive_session
+from changes import HEARTBEAT_SECONDS, change_hub
+from browser import BlockPolicy, BrowserBusyError, browser_manager, recording_browsers
+from observation import extract_observation
+from replay import plan_error, replay_action_plan
+from page_cache import page_cache
+from plan_compiler import ActionPlanCompiler
+from recording_store import RecordingWriter, list_recordings, read_events
+from recorder import (
+    BATCH_MAX_EVENTS, BATCH_WINDOW_MS, MAX_BATCH_WINDOW_MS, MAX_BUFFERED_EVENTS, RECORDER_MODE, RECORDER_MODES, load_recorder_script, recording_metrics,
+    rrweb_record_options,
+)
+from db import AsyncDatabase, migrate
+import store
+from ids import new_task_id
+from notifications import FakeMessagingBackend, FirebaseMessagingBackend, send_reminders
 
 # --- Environment & Key Checks ---
 print("--- Initializing Remo Backend ---")
@@ -27,43 +46,12 @@ print("OK: GOOGLE_API_KEY loaded.")
 
 # --- Database Setup ---
 DB_NAME = "remo.db"
+database = AsyncDatabase(DB_NAME)
 
-def init_db():
+async def init_db():
     """Initializes the SQLite database with the final, rich schema."""
-    db = sqlite3.connect(DB_NAME)
-    cursor = db.cursor()
-    print("DB: Creating 'tasks' table...")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            title TEXT NOT NULL,
-            notes TEXT,
-            url TEXT,
-            due_time TEXT,
-            repeat_rule TEXT,
-            priority TEXT,
-            is_flagged BOOLEAN,
-            tags_csv TEXT,
-            early_reminder_offset_mins INTEGER,
-            status TEXT NOT NULL,
-            is_training_required BOOLEAN,
-            action_plan_json TEXT,
-            training_transcript TEXT,
-            creation_date TEXT NOT NULL,
-            last_run_log TEXT
-        )
-    """)
-    print("DB: Creating 'push_tokens' table...")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS push_tokens (
-            user_id TEXT PRIMARY KEY,
-            token TEXT NOT NULL
-        )
-    """)
-    db.commit()
-    db.close()
-    print("OK: Database initialized.")
+    version = await database.write(migrate, store.MIGRATIONS)
+    print(f"OK: Database initialized (schema version {version}).")
 
 # --- Firebase Admin SDK Initialization ---
 try:
@@ -75,32 +63,44 @@ except Exception as e:
     print(f"[WARNING] Could not initialize Firebase: {e}")
     print("[WARNING] Push notification functionality will be disabled.")
 
+# Set REMO_FAKE_FCM=1 to deliver reminders to an offline fake (for load testing).
+if os.getenv("REMO_FAKE_FCM") == "1":
+    messaging_backend = FakeMessagingBackend()
+    print("[WARNING] Using the fake FCM backend; no push notifications will be delivered.")
+else:
+    messaging_backend = FirebaseMessagingBackend()
+
 
 # --- Lifespan Manager ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Code to run on startup
     print("--- Running application startup logic ---")
-    init_db()
+    database.open()
+    await init_db()
     try:
         cred = credentials.Certificate("secrets/serviceAccountKey.json")
         firebase_admin.initialize_app(cred)
         print("OK: Firebase Admin SDK initialized.")
     except Exception as e:
         print(f"[WARNING] Could not initialize Firebase: {e}")
+    await browser_manager.start()
+    try:
+        load_recorder_script()
+    except FileNotFoundError as e:
+        print(f"[WARNING] {e}. Recording sessions will fail.")
     # The application is now running. The 'yield' passes control back.
     yield
-    # Code to run on shutdown (we don't have any for now)
+    # Code to run on shutdown
     print("--- Running application shutdown logic ---")
+    await browser_manager.stop()
+    for recording_browser in recording_browsers.values():
+        await recording_browser.stop()
+    database.close()
 
 # --- 1. FastAPI Application Setup ---
 app = FastAPI(title="Remo Final Backend", lifespan=lifespan)
 
-@app.on_event("startup")
-def on_startup():
-    """Run initial setup tasks when the server starts."""
-    init_db()
-
 # --- 2. ADK Service Initialization ---
 session_service = InMemorySessionService()
 browse_runner = Runner(agent=browser_agent, app_name="remo_app", session_service=session_service)
@@ -127,6 +127,9 @@ class Task(BaseModel):
     training_transcript: str | None = None
     creation_date: str
     last_run_log: str | None = None
+    recording_sampling_json: str | None = None
+    updated_at: str | None = None
+    compiled_plan_json: str | None = None
 
 class CreateTaskRequest(BaseModel):
     user_id: str
@@ -141,6 +144,29 @@ class CreateTaskRequest(BaseModel):
     early_reminder_offset_mins: int | None = None
     is_training_required: bool = False
 
+class TaskUpdate(BaseModel):
+    """One item of a bulk update: the task id plus only the fields to change."""
+    id: str
+    title: str | None = None
+    notes: str | None = None
+    url: str | None = None
+    due_time: str | None = None
+    repeat_rule: str | None = None
+    priority: str | None = None
+    is_flagged: bool | None = None
+    tags_csv: str | None = None
+    early_reminder_offset_mins: int | None = None
+    status: Literal["pending", "notified", "trained"] | None = None
+
+class RecordingSampling(BaseModel):
+    """rrweb sampling for a task's recording sessions. Unset fields keep rrweb's defaults."""
+    mousemove_ms: int | None = Field(default=None, ge=0)  # 0 = don't record mouse movement
+    mouse_interaction: bool = True
+    scroll_ms: int | None = Field(default=None, ge=0)
+    input_mode: Literal["all", "last"] | None = None
+    checkout_every_n: int | None = Field(default=None, ge=1)  # full snapshot every N events
+    checkout_every_ms: int | None = Field(default=None, ge=1)
+
 class PushTokenRequest(BaseModel):
     user_id: str
     token: str
@@ -149,11 +175,13 @@ class PushTokenRequest(BaseModel):
 class BrowseTaskRequest(BaseModel):
     user_id: str
     url: str
-    
+    page_cache_bypass: bool = False  # always load live pages instead of cached observations
+
 class ThinkerTaskRequest(BaseModel):
     user_id: str
     url: str
     goal: str
+    page_cache_bypass: bool = False
 
 # --- 4. API Endpoints ---
 
@@ -161,73 +189,273 @@ class ThinkerTaskRequest(BaseModel):
 def read_root():
     return {"message": "Remo backend is running."}
 
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "5000"))
+
 @app.post("/tasks", response_model=Task)
 async def create_task(request: CreateTaskRequest):
     """Creates a new, feature-rich task and saves it to the database."""
-    db = sqlite3.connect(DB_NAME)
-    cursor = db.cursor()
-    new_task_id = "task_" + str(hash(request.title + str(datetime.now())))[:8]
-    creation_date_iso = datetime.now(timezone.utc).isoformat()
-    new_task = Task(id=new_task_id, creation_date=creation_date_iso, status="pending", **request.model_dump())
-
-    cursor.execute(
-        "INSERT INTO tasks (id, user_id, title, notes, url, due_time, repeat_rule, priority, is_flagged, tags_csv, early_reminder_offset_mins, status, is_training_required, action_plan_json, training_transcript, creation_date, last_run_log) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        tuple(new_task.model_dump().values())
-    )
-    db.commit()
-    db.close()
+    created = datetime.now(timezone.utc)
+    new_task = Task(id=new_task_id(created), creation_date=created.isoformat(), status="pending", **request.model_dump())
+
+    new_task.updated_at = await write_task_changes(store.insert_task, new_task.model_dump(),
+                                                   changed_ids=lambda _: [new_task.id])
     print(f"API: Created rich task '{request.title}'")
     return new_task
 
-@app.get("/tasks/{user_id}", response_model=list[Task])
-async def list_tasks_for_user(user_id: str):
-    """Fetches all feature-rich tasks for a given user from the database."""
-    db = sqlite3.connect(DB_NAME)
-    db.row_factory = sqlite3.Row
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM tasks WHERE user_id = ?", (user_id,))
-    tasks = [dict(row) for row in cursor.fetchall()]
-    db.close()
-    return tasks
+def _check_bulk_size(items: list):
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request.")
+
+@app.post("/tasks/bulk")
+async def create_tasks_bulk(items: list[dict] = Body(...)):
+    """
+    Creates many tasks (e.g. an import from another reminder app) in a single
+    transaction. Items are validated one by one: invalid ones are reported by
+    index under `errors` and the rest are still created.
+    """
+    _check_bulk_size(items)
+    now = datetime.now(timezone.utc)
+    creation_date_iso = now.isoformat()
+    new_tasks, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            request = CreateTaskRequest.model_validate(item)
+        except ValidationError as e:
+            errors.append({"index": index, "error": e.errors(include_url=False)})
+            continue
+        new_tasks.append({
+            **dict.fromkeys(store.TASK_COLUMNS),
+            **request.model_dump(),
+            "id": new_task_id(now),
+            "creation_date": creation_date_iso,
+            "status": "pending",
+        })
+        indexes.append(index)
+    failed = await write_task_changes(
+        store.insert_tasks, new_tasks,
+        changed_ids=lambda failed: [task["id"] for i, task in enumerate(new_tasks) if i not in failed],
+    ) if new_tasks else {}
+    errors += [{"index": indexes[i], "error": message} for i, message in failed.items()]
+    created_items = [{"index": indexes[i], "id": task["id"]} for i, task in enumerate(new_tasks) if i not in failed]
+    print(f"API: Bulk-created {len(created_items)} task(s), {len(errors)} error(s)")
+    return {"created": created_items, "errors": sorted(errors, key=lambda e: e["index"])}
+
+@app.patch("/tasks/bulk")
+async def update_tasks_bulk(items: list[dict] = Body(...)):
+    """
+    Updates fields (including status) on many tasks in a single transaction.
+    Each item is a task id plus only the fields to change; failures are
+    reported by index under `errors` and don't stop the others.
+    """
+    _check_bulk_size(items)
+    updates, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            update = TaskUpdate.model_validate(item).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            errors.append({"index": index, "error": e.errors(include_url=False)})
+            continue
+        not_null = [col for col in ("title", "status") if col in update and update[col] is None]
+        if not_null:
+            errors.append({"index": index, "error": f"{', '.join(not_null)} can't be null"})
+            continue
+        updates.append(update)
+        indexes.append(index)
+    failed = await write_task_changes(
+        store.update_tasks, updates,
+        changed_ids=lambda failed: list(dict.fromkeys(u["id"] for i, u in enumerate(updates) if i not in failed)),
+    ) if updates else {}
+    errors += [{"index": indexes[i], "error": message} for i, message in failed.items()]
+    updated = [update["id"] for i, update in enumerate(updates) if i not in failed]
+    print(f"API: Bulk-updated {len(updated)} task(s), {len(errors)} error(s)")
+    return {"updated": len(updated), "errors": sorted(errors, key=lambda e: e["index"])}
+
+def _encode_cursor(key: tuple) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, task_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(timestamp), str(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _publish_changes(events: list[tuple]):
+    for user_id, event in events:
+        change_hub.publish(user_id, event)
+
+def _if_saved(task_id: str):
+    return lambda saved: [task_id] if saved else []
+
+async def write_task_changes(fn, *args, changed_ids):
+    """
+    Runs a task write and pushes the tasks it changed to their owners' change
+    feeds. `changed_ids(result)` names those tasks; they're read back inside
+    the write's own transaction and published from the commit callback, so
+    feed events (and their sync cursors) go out in commit order.
+    """
+    def write(db, *args):
+        result = fn(db, *args)
+        task_ids = changed_ids(result)
+        events = []
+        if task_ids and change_hub.has_subscribers():
+            events = [(task["user_id"], {
+                "type": "task",
+                "task": task,
+                "sync_cursor": _encode_cursor((task["updated_at"], task["id"])),
+            }) for task in store.tasks_by_ids(db, task_ids)]
+        return result, events
+
+    result, _ = await database.write(write, *args, on_commit=lambda written: _publish_changes(written[1]))
+    return result
+
+def _list_columns(fields: str | None) -> tuple:
+    """The projection for a listing: the light columns by default, otherwise the named ones plus the cursor keys."""
+    if not fields:
+        return store.LIST_TASK_COLUMNS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in store.TASK_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", "creation_date", *requested]))
+
+@app.get("/tasks/{user_id}")
+async def list_tasks_for_user(user_id: str, limit: int = Query(default=50, ge=1, le=200),
+                              cursor: str | None = None, fields: str | None = None, since: str | None = None):
+    """
+    Lists a user's tasks, newest first, one page at a time. Pass the returned
+    `next_cursor` to get the following page. Heavy columns (action plan,
+    transcript, run log) are left out unless named in `fields`; fetch them
+    per task from `/tasks/{task_id}/detail`.
+
+    With `since`, returns only what changed after that sync cursor instead:
+    tasks created or updated, oldest change first, plus the ids of deleted
+    tasks. Start with `since=` (empty) for a full sync, keep the returned
+    `sync_cursor`, and call again while `has_more` is true.
+    """
+    columns = _list_columns(fields)
+    # Rows are already plain JSON values; skip response-model validation.
+    if since is not None:
+        after = _decode_cursor(since) if since else ("", "")
+        tasks, deleted, last_key, has_more = await database.read(store.task_changes, user_id, after, columns, limit)
+        sync_cursor = _encode_cursor(last_key) if last_key else since
+        return JSONResponse({"tasks": tasks, "deleted": deleted, "sync_cursor": sync_cursor, "has_more": has_more})
+    after = _decode_cursor(cursor) if cursor else None
+    tasks = await database.read(store.list_tasks, user_id, columns, limit, after)
+    next_cursor = _encode_cursor((tasks[-1]["creation_date"], tasks[-1]["id"])) if len(tasks) == limit else None
+    return JSONResponse({"tasks": tasks, "next_cursor": next_cursor})
+
+@app.get("/tasks/{user_id}/changes")
+async def stream_task_changes(user_id: str, request: Request):
+    """
+    Server-sent events for a user's tasks as they change: `task` events carry
+    the task's list columns and a `sync_cursor`, `deleted` events a task id.
+    A `resync` event means the client fell behind and should catch up through
+    `GET /tasks/{user_id}?since=<its last sync_cursor>`.
+    """
+    async def events():
+        with change_hub.subscribe(user_id) as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/tasks/{task_id}/detail", response_model=Task)
+async def get_task_detail(task_id: str):
+    """Fetches one task with every column, including the action plan and transcript."""
+    task = await database.read(store.get_task, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@app.delete("/tasks/{task_id}")
+async def delete_task(task_id: str):
+    """Deletes a task. Syncing clients see it in the `deleted` list of their next delta."""
+    def delete(db, task_id):
+        user_id = store.delete_task(db, task_id)
+        return user_id, [(user_id, {"type": "deleted", "task_id": task_id})] if user_id else []
+
+    user_id, _ = await database.write(delete, task_id, on_commit=lambda written: _publish_changes(written[1]))
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {"status": "success", "task_id": task_id}
 
 @app.post("/tasks/{task_id}/complete_training")
-async def complete_task_training(task_id: str, action_plan: list, transcript: str):
-    """Saves the recorded action plan and transcript after a training session."""
-    db = sqlite3.connect(DB_NAME)
-    cursor = db.cursor()
-    action_plan_str = json.dumps(action_plan)
-    cursor.execute(
-        "UPDATE tasks SET action_plan_json = ?, training_transcript = ?, status = 'trained' WHERE id = ?",
-        (action_plan_str, transcript, task_id)
-    )
-    if cursor.rowcount == 0:
-        db.close()
+async def complete_task_training(task_id: str, transcript: str, action_plan: list | None = Body(default=None)):
+    """
+    Saves the action plan and transcript after a training session. If the client
+    doesn't send a plan, the one compiled server-side from the recording is used.
+    """
+    if action_plan is None:
+        row = await database.read(store.compiled_plan_for_task, task_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if row[0] is None:
+            raise HTTPException(status_code=409, detail="No recorded action plan for this task; send action_plan in the body.")
+        action_plan_str = row[0]
+    else:
+        action_plan_str = json.dumps(action_plan)
+    if not await write_task_changes(store.save_training, task_id, action_plan_str, transcript, changed_ids=_if_saved(task_id)):
         raise HTTPException(status_code=404, detail="Task not found")
-    db.commit()
-    db.close()
     print(f"API: Saved training data for task {task_id}")
     return {"status": "success", "task_id": task_id}
 
+@app.put("/tasks/{task_id}/recording_sampling")
+async def set_task_recording_sampling(task_id: str, sampling: RecordingSampling):
+    """Sets the rrweb sampling used when recording this task."""
+    if not await write_task_changes(store.set_recording_sampling, task_id, sampling.model_dump_json(exclude_defaults=True),
+                                    changed_ids=_if_saved(task_id)):
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {"status": "success", "task_id": task_id, "recording_sampling": sampling}
+
 @app.post("/register-push-token")
 async def register_push_token(request: PushTokenRequest):
     """Saves or updates a user's device push token."""
-    db = sqlite3.connect(DB_NAME)
-    cursor = db.cursor()
-    cursor.execute("INSERT OR REPLACE INTO push_tokens (user_id, token) VALUES (?, ?)", (request.user_id, request.token))
-    db.commit()
-    db.close()
+    await database.write(store.upsert_push_token, request.user_id, request.token)
     print(f"API: Registered push token for user {request.user_id}")
     return {"status": "success"}
 
+@app.get("/metrics/browser")
+def browser_metrics():
+    """Reports browser page-pool usage (active pages, queue depth, wait times) and page-cache hit rates."""
+    return {**browser_manager.stats(), "page_cache": page_cache.stats()}
+
+@app.get("/metrics/changes")
+def change_feed_metrics():
+    """Reports open change feeds and events published, delivered and dropped for resync."""
+    return change_hub.stats()
+
+@app.get("/metrics/recording")
+def recording_stream_metrics():
+    """Reports recording stream totals (events, frames, bytes) and recording browser usage."""
+    return {**recording_metrics, "browsers": {mode: b.stats() for mode, b in recording_browsers.items()}}
+
 # --- Direct Agent Execution Endpoints (For Testing & "Run Now") ---
+async def end_browser_session(session_id: str):
+    """Closes an agent session's browser context and drops its private page-cache entries."""
+    await browser_manager.release(session_id)
+    page_cache.drop_scope(session_id)
+
 @app.post("/execute/browse")
 async def execute_browse_task(request: BrowseTaskRequest):
-    session = await session_service.create_session(app_name="remo_app", user_id=request.user_id)
+    session = await session_service.create_session(
+        app_name="remo_app", user_id=request.user_id, state={"page_cache_bypass": request.page_cache_bypass}
+    )
     agent_input = Content(role="user", parts=[Part(text=f"Please browse to: {request.url}")])
     final_result = "Agent did not produce a final response."
     events = browse_runner.run_async(user_id=request.user_id, session_id=session.id, new_message=agent_input)
-    async for event in events:
-        if event.is_final_response(): final_result = event.content.parts[0].text
+    try:
+        async for event in events:
+            if event.is_final_response(): final_result = event.content.parts[0].text
+    finally:
+        await end_browser_session(session.id)
     return {"status": "completed", "session_id": session.id, "agent_result": final_result}
 
 @app.post("/execute/think")
@@ -236,60 +464,199 @@ async def execute_thinker_task(request: ThinkerTaskRequest):
     session = await session_service.create_session(
         app_name="remo_app",
         user_id=request.user_id,
-        state={"user_goal": request.goal, "start_url": request.url, "page_observation": ""}
+        state={"user_goal": request.goal, "start_url": request.url, "page_observation": "",
+               "page_cache_bypass": request.page_cache_bypass}
     )
     agent_input = Content(role="user", parts=[Part(text="Start task.")])
     final_result = "Thinker agent finished without a final text response."
-    async for event in thinker_runner.run_async(user_id=request.user_id, session_id=session.id, new_message=agent_input):
-        if event.is_final_response(): final_result = event.content.parts[0].text
+    try:
+        async for event in thinker_runner.run_async(user_id=request.user_id, session_id=session.id, new_message=agent_input):
+            if event.is_final_response(): final_result = event.content.parts[0].text
+    finally:
+        await end_browser_session(session.id)
     return {"status": "completed", "final_result": final_result, "session_id": session.id}
 
+@app.post("/tasks/{task_id}/run")
+async def run_trained_task(task_id: str):
+    """
+    Runs a trained task by replaying its stored action plan directly in the
+    browser, with no model calls. The thinker agent only takes over, from the
+    page where replay stopped, if a step fails.
+    """
+    row = await database.read(store.replay_target, task_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    user_id, title, notes, url, action_plan_json = row
+    if not action_plan_json:
+        raise HTTPException(status_code=409, detail="Task has no action plan; train it first.")
+    plan = json.loads(action_plan_json)
+    error = plan_error(plan)
+    if error:
+        raise HTTPException(status_code=409, detail=f"Stored action plan can't be replayed ({error}); retrain the task.")
+    if url and (not plan or plan[0].get("action") != "navigate"):
+        plan = [{"action": "navigate", "url": url, "implicit": False}] + plan
+
+    # The agent fallback reuses this id as its ADK session id, so it continues
+    # in the same browser context (cookies, logins) that replay left behind.
+    # That context loads everything, like the recording did: plans can target
+    # images, icon buttons and CSS-driven menus that the agent's load mode drops.
+    session_id = f"replay-{uuid.uuid4().hex}"
+    mode, final_result = "replay", None
+    try:
+        async with browser_manager.page(session_id, BlockPolicy.for_mode("full")) as page:
+            result = await replay_action_plan(page, plan)
+            observation = ""
+            if result["status"] == "failed":
+                try:
+                    observation = await extract_observation(page)
+                except Exception as e:
+                    print(f"API: Could not observe page after failed replay: {e}")
+        if result["status"] == "failed":
+            mode = "agent_fallback"
+            failed = plan[result["failed_step"]]
+            goal = f"{title}. {notes}" if notes else title
+            goal += (
+                f" (A recorded run completed {result['steps_completed']} of {len(plan)} steps and then failed to "
+                f"{failed.get('action')} {failed.get('text') or failed.get('url') or ''}. Continue from the current page.)"
+            )
+            print(f"API: Replay of task {task_id} failed at step {result['failed_step']}, falling back to the thinker agent")
+            await session_service.create_session(
+                app_name="remo_app",
+                user_id=user_id,
+                session_id=session_id,
+                state={"user_goal": goal, "start_url": result["url"], "page_observation": observation},
+            )
+            final_result = "Thinker agent finished without a final text response."
+            agent_input = Content(role="user", parts=[Part(text="Start task.")])
+            async for event in thinker_runner.run_async(user_id=user_id, session_id=session_id, new_message=agent_input):
+                if event.is_final_response(): final_result = event.content.parts[0].text
+    except BrowserBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    finally:
+        await end_browser_session(session_id)
+
+    run_log = {"mode": mode, "replay": result, "agent_result": final_result,
+               "finished_at": datetime.now(timezone.utc).isoformat()}
+    await write_task_changes(store.save_run_log, task_id, json.dumps(run_log), changed_ids=_if_saved(task_id))
+    return {
+        "status": "completed",
+        "task_id": task_id,
+        "mode": mode,
+        "steps_completed": result["steps_completed"],
+        "steps_total": len(plan),
+        "replay_seconds": round(result["seconds"], 3),
+        "agent_result": final_result,
+    }
+
 @app.websocket("/ws/record/{task_id}/{user_id}")
-async def websocket_record_session(websocket: WebSocket, task_id: str, user_id: str):
-    """Establishes a WebSocket and starts an interactive rrweb recording session."""
+async def websocket_record_session(websocket: WebSocket, task_id: str, user_id: str,
+                                   batch_ms: int = Query(default=BATCH_WINDOW_MS, ge=0, le=MAX_BATCH_WINDOW_MS),
+                                   batch_events: int = Query(default=BATCH_MAX_EVENTS, ge=1, le=MAX_BUFFERED_EVENTS),
+                                   encoding: str = "json", mousemove_ms: int | None = None,
+                                   scroll_ms: int | None = None, input_mode: str | None = None,
+                                   checkout_every_n: int | None = None, checkout_every_ms: int | None = None,
+                                   mode: str = RECORDER_MODE, screencast_quality: int | None = None,
+                                   screencast_fps: float | None = None):
+    """
+    Establishes a WebSocket and starts an interactive rrweb recording session.
+    Events arrive as arrays; `batch_ms` / `batch_events` tune the batching and
+    `encoding` picks the wire format (json, json+deflate, msgpack, msgpack+deflate).
+    The task's stored RecordingSampling applies unless overridden by the
+    matching query parameters. `mode=headless` records without a server display:
+    the page comes back as screencast frames (`screencast_quality`, `screencast_fps`)
+    and the client sends its input over the socket.
+    """
     await websocket.accept()
     print(f"API: WebSocket connection accepted for task {task_id}")
     # In a real app, you'd fetch the task's URL from the DB.
     start_url = "https://google.github.io/adk-docs/"
+    overrides = {
+        "mousemove_ms": mousemove_ms, "scroll_ms": scroll_ms, "input_mode": input_mode,
+        "checkout_every_n": checkout_every_n, "checkout_every_ms": checkout_every_ms,
+    }
     try:
-        await start_interactive_session(url=start_url, websocket=websocket)
+        stored = await database.read(store.recording_sampling_for_task, task_id)
+        sampling = RecordingSampling(**{
+            **(json.loads(stored) if stored else {}),
+            **{k: v for k, v in overrides.items() if v is not None},
+        })
+    except ValidationError as e:
+        await websocket.send_text(json.dumps({"error": f"Invalid recording sampling: {e}"}))
+        await websocket.close()
+        return
+    if mode not in RECORDER_MODES:
+        await websocket.send_text(json.dumps({"error": f"Unknown recording mode '{mode}'; expected one of {', '.join(RECORDER_MODES)}."}))
+        await websocket.close()
+        return
+    screencast_options = {}
+    if screencast_quality is not None:
+        screencast_options["quality"] = screencast_quality
+    if screencast_fps is not None:
+        screencast_options["fps"] = screencast_fps
+    # The action plan is compiled from the live event stream as it arrives.
+    plan_compiler = ActionPlanCompiler()
+    try:
+        # Events are persisted as they stream so the recording survives the session.
+        async with RecordingWriter(task_id) as recording_writer:
+            await start_interactive_session(url=start_url, websocket=websocket,
+                                            batch_window_ms=batch_ms, batch_max_events=batch_events,
+                                            encoding=encoding, record_options=rrweb_record_options(**sampling.model_dump()),
+                                            sinks=[recording_writer, plan_compiler],
+                                            headless=(mode == "headless"), screencast_options=screencast_options)
     except Exception as e:
         print(f"WebSocket session for task {task_id} encountered an error: {e}")
     finally:
+        action_plan = plan_compiler.plan()
+        # A session that never got past loading the page (e.g. an aborted
+        # reconnect) would only clobber a useful plan from an earlier one.
+        if any(step["action"] != "navigate" for step in action_plan):
+            await write_task_changes(store.save_compiled_plan, task_id, json.dumps(action_plan), changed_ids=_if_saved(task_id))
+            print(f"API: Compiled a {len(action_plan)}-step action plan for task {task_id}")
         print(f"WebSocket connection for task {task_id} closed.")
 
+@app.get("/tasks/{task_id}/recordings")
+async def list_task_recordings(task_id: str):
+    """Lists the recording sessions stored on the server for a task."""
+    try:
+        return await asyncio.to_thread(list_recordings, task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/tasks/{task_id}/recordings/{recording_id}")
+async def get_task_recording(task_id: str, recording_id: str):
+    """Streams a stored recording's rrweb events as newline-delimited JSON, for replay or re-processing."""
+    try:
+        events = read_events(task_id, recording_id)
+        first = await asyncio.to_thread(next, events, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    def ndjson():
+        if first is not None:
+            yield json.dumps(first) + "\n"
+        for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 # --- Background Scheduler ---
 @repeat_every(seconds=60, wait_first=True)
 async def check_reminders() -> None:
     """Periodically checks the DB for due reminders and sends push notifications."""
     print("Scheduler: Checking for due reminders...")
-    db = sqlite3.connect(DB_NAME)
-    cursor = db.cursor()
     current_time_iso = datetime.now(timezone.utc).isoformat()
-    cursor.execute("SELECT id, user_id, title FROM tasks WHERE due_time <= ? AND status = 'pending'", (current_time_iso,))
-    due_reminders = cursor.fetchall()
-    
+    due_reminders = await database.read(store.due_reminders, current_time_iso)
+
     if not due_reminders:
         print("Scheduler: No reminders due at this time.")
-        db.close()
         return
 
-    for task_id, user_id, title in due_reminders:
-        cursor.execute("SELECT token FROM push_tokens WHERE user_id = ?", (user_id,))
-        token_row = cursor.fetchone()
-        if token_row:
-            push_token = token_row[0]
-            print(f"Scheduler: Sending notification for '{title}' to user {user_id}")
-            message = messaging.Message(
-                notification=messaging.Notification(title="Remo Reminder!", body=title),
-                token=push_token,
-            )
-            try:
-                messaging.send(message)
-                cursor.execute("UPDATE tasks SET status = 'notified' WHERE id = ?", (task_id,))
-                db.commit()
-                print(f"Scheduler: Task {task_id} marked as 'notified'.")
-            except Exception as e:
-                print(f"FCM Error for task {task_id}: {e}")
-    
-    db.close()
\ No newline at end of file
+    print(f"Scheduler: Sending {len(due_reminders)} reminder(s)...")
+    notified_ids = await send_reminders(due_reminders, messaging_backend)
+
+    # One transaction (and one fsync) for the whole pass.
+    if notified_ids:
+        updated = await write_task_changes(store.mark_notified, notified_ids, changed_ids=lambda _: notified_ids)
+        print(f"Scheduler: Marked {updated} task(s) as 'notified'.")
@@ -0,0 +1,91 @@
+# in remo-backend/notifications.py
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from firebase_admin import messaging
+
+# FCM rejects batch requests with more than 500 messages.
+FCM_BATCH_LIMIT = 500
+# How many batch requests may be in flight at once.
+MAX_CONCURRENT_BATCHES = 4
+
+
+class FirebaseMessagingBackend:
+    """Sends through the real Firebase Admin SDK."""
+
+    def message(self, token: str, title: str, body: str):
+        return messaging.Message(
+            notification=messaging.Notification(title=title, body=body),
+            token=token,
+        )
+
+    def send_each(self, messages: list):
+        # Blocking HTTP call; the dispatcher runs it in a worker thread.
+        return messaging.send_each(messages)
+
+
+class FakeMessagingBackend:
+    """
+    Offline stand-in for FCM used for load testing. Mimics the shape of
+    `messaging.send_each()`'s BatchResponse, with a configurable per-batch
+    latency and random per-message failure rate.
+    """
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.batches_sent = 0
+        self.messages_sent = 0
+
+    def message(self, token: str, title: str, body: str):
+        return {"token": token, "title": title, "body": body}
+
+    def send_each(self, messages: list):
+        if len(messages) > FCM_BATCH_LIMIT:
+            raise ValueError(f"send_each() accepts at most {FCM_BATCH_LIMIT} messages.")
+        time.sleep(self.latency)
+        responses = []
+        for i, msg in enumerate(messages):
+            if self._random.random() < self.failure_rate:
+                responses.append(SimpleNamespace(success=False, message_id=None, exception=RuntimeError("fake delivery failure")))
+            else:
+                responses.append(SimpleNamespace(success=True, message_id=f"fake-{self.messages_sent + i}", exception=None))
+        self.batches_sent += 1
+        self.messages_sent += len(messages)
+        failures = sum(1 for r in responses if not r.success)
+        return SimpleNamespace(responses=responses, success_count=len(responses) - failures, failure_count=failures)
+
+
+async def send_reminders(reminders: list[tuple], backend) -> list[str]:
+    """
+    Sends one push notification per `(task_id, user_id, title, push_token)`
+    reminder, batching up to FCM_BATCH_LIMIT messages per `send_each()` call.
+    The blocking sends run off the event loop. Returns the ids of the tasks
+    whose notification was accepted by FCM.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+    async def send_batch(batch: list[tuple]) -> list[str]:
+        messages = [backend.message(token=token, title="Remo Reminder!", body=title) for _, _, title, token in batch]
+        async with semaphore:
+            try:
+                response = await asyncio.to_thread(backend.send_each, messages)
+            except Exception as e:
+                print(f"FCM Error for a batch of {len(batch)} reminders: {e}")
+                return []
+        delivered = []
+        # Responses come back in the same order as the messages we sent.
+        for (task_id, _, _, _), result in zip(batch, response.responses):
+            if result.success:
+                delivered.append(task_id)
+            else:
+                print(f"FCM Error for task {task_id}: {result.exception}")
+        return delivered
+
+    batches = [reminders[i:i + FCM_BATCH_LIMIT] for i in range(0, len(reminders), FCM_BATCH_LIMIT)]
+    results = await asyncio.gather(*(send_batch(batch) for batch in batches))
+    return [task_id for delivered in results for task_id in delivered]
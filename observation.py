@@ -0,0 +1,123 @@
+# in remo-backend/observation.py
+
+import os
+
+# Maximum size of the observation handed to the planner, in characters.
+OBSERVATION_CHAR_BUDGET = int(os.getenv("OBSERVATION_CHAR_BUDGET", "8000"))
+# Share of the budget reserved for interactive elements; text fills the rest.
+ELEMENT_BUDGET_SHARE = 0.6
+
+# Runs in the page. Collects visible interactive elements and leaf text blocks,
+# skipping scripts, styles and anything hidden. Each interactive element is
+# tagged with a data-remo-id attribute the first time it is seen, so its id
+# stays the same across repeated observations of the same page.
+EXTRACT_JS = r"""
+() => {
+    const INTERACTIVE = 'a[href], button, input:not([type=hidden]), select, textarea, summary, '
+        + '[role=button], [role=link], [role=checkbox], [role=radio], [role=tab], [role=menuitem], '
+        + '[role=option], [role=switch], [role=combobox], [contenteditable=""], [contenteditable=true]';
+    const TEXT_BLOCKS = 'h1, h2, h3, h4, h5, h6, p, li, td, th, label, blockquote, pre, figcaption';
+    const clean = (s, max) => (s || '').replace(/\s+/g, ' ').trim().slice(0, max);
+    const isVisible = (el) => {
+        if (el.closest('[hidden], [aria-hidden=true]')) return false;
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    window.__remoNextId = window.__remoNextId || 1;
+    const elements = [];
+    for (const el of document.querySelectorAll(INTERACTIVE)) {
+        if (!isVisible(el)) continue;
+        let id = el.getAttribute('data-remo-id');
+        if (!id) {
+            id = 'e' + window.__remoNextId++;
+            el.setAttribute('data-remo-id', id);
+        }
+        const name = el.getAttribute('aria-label') || el.innerText || el.value
+            || el.getAttribute('placeholder') || el.getAttribute('title') || el.getAttribute('alt') || '';
+        elements.push({
+            id,
+            tag: el.tagName.toLowerCase(),
+            role: el.getAttribute('role') || '',
+            type: el.getAttribute('type') || '',
+            name: clean(name, 80),
+            href: el.tagName === 'A' ? clean(el.getAttribute('href'), 120) : '',
+        });
+    }
+
+    const text = [];
+    for (const el of document.querySelectorAll(TEXT_BLOCKS)) {
+        // Leaf blocks only, so nested lists/paragraphs aren't repeated.
+        if (el.querySelector(TEXT_BLOCKS) || el.closest('a, button') || !isVisible(el)) continue;
+        const t = clean(el.innerText, 300);
+        if (t) text.push({ tag: el.tagName.toLowerCase(), text: t });
+    }
+    return { url: location.href, title: document.title, elements, text };
+}
+"""
+
+
+def format_element(el: dict) -> str:
+    kind = el["role"] or el["tag"]
+    if el["type"] and el["tag"] == "input":
+        kind = f"input[{el['type']}]"
+    line = f"[{el['id']}] {kind}"
+    if el["name"]:
+        line += f' "{el["name"]}"'
+    if el["href"]:
+        line += f" -> {el['href']}"
+    return line
+
+
+def format_text_block(block: dict) -> str:
+    if block["tag"].startswith("h") and block["tag"][1:].isdigit():
+        return "#" * int(block["tag"][1:]) + " " + block["text"]
+    if block["tag"] == "li":
+        return "- " + block["text"]
+    return block["text"]
+
+
+def _take_lines(lines: list[str], budget: int) -> tuple[list[str], int]:
+    """Takes lines in order while they fit in `budget` characters."""
+    taken, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > budget:
+            break
+        taken.append(line)
+        used += len(line) + 1
+    return taken, used
+
+
+def render_observation(raw: dict, budget: int = OBSERVATION_CHAR_BUDGET) -> str:
+    """
+    Turns the output of EXTRACT_JS into a compact text observation no longer
+    than `budget` characters. Interactive elements get first claim on the
+    budget, then visible text; anything cut is summarized with a count.
+    """
+    header = f"Page: {raw.get('title') or '(untitled)'}\nURL: {raw.get('url', '')}\n"
+    element_lines = [format_element(el) for el in raw.get("elements", [])]
+    text_lines = [format_text_block(block) for block in raw.get("text", [])]
+
+    # Leave room for section titles and the "omitted" notes.
+    remaining = max(0, budget - len(header) - 200)
+    element_budget = int(remaining * ELEMENT_BUDGET_SHARE) if text_lines else remaining
+    elements, used = _take_lines(element_lines, element_budget)
+    text, _ = _take_lines(text_lines, remaining - used)
+
+    parts = [header, "\nInteractive elements (refer to them by id):\n"]
+    parts.append("\n".join(elements) or "(none)")
+    if len(elements) < len(element_lines):
+        parts.append(f"\n... {len(element_lines) - len(elements)} more elements omitted")
+    parts.append("\n\nVisible text:\n")
+    parts.append("\n".join(text) or "(none)")
+    if len(text) < len(text_lines):
+        parts.append(f"\n... {len(text_lines) - len(text)} more text blocks omitted")
+    return "".join(parts)[:budget]
+
+
+async def extract_observation(page, budget: int = OBSERVATION_CHAR_BUDGET) -> str:
+    """Builds the compact observation for the page currently loaded in `page`."""
+    raw = await page.evaluate(EXTRACT_JS)
+    return render_observation(raw, budget)
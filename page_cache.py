@@ -0,0 +1,152 @@
+# in remo-backend/page_cache.py
+
+import os
+import re
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# How long an observation stays fresh when the server says nothing about it,
+# and the most we'll trust a server's max-age.
+DEFAULT_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL", "300"))
+MAX_TTL_SECONDS = float(os.getenv("PAGE_CACHE_MAX_TTL", "3600"))
+# Upper bound on the total size of cached observations, in bytes.
+MAX_CACHE_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Query parameters that never change what a page shows.
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref_src)$", re.IGNORECASE)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a URL: lower-cased scheme and host, default port
+    and fragment dropped, tracking parameters removed and the rest sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def parse_cache_control(headers: dict) -> dict:
+    """Parses a Cache-Control header into {directive: value-or-True}."""
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+class PageCache:
+    """
+    TTL + LRU cache of extracted page observations, bounded by total size.
+
+    Freshness follows the page's Cache-Control header where present: no-store
+    responses are never cached, no-cache entries always need revalidation, and
+    max-age sets the TTL (capped at MAX_TTL_SECONDS). Stale entries that came
+    with an ETag are kept so the caller can revalidate them with a conditional
+    request instead of re-rendering the page.
+
+    Entries are shared by every caller unless stored under a `scope` (e.g. a
+    browser session id), which only lookups with the same scope can see. The
+    shared cache refuses private responses and responses that set cookies;
+    a scoped one accepts them, since nobody else can read them back.
+    """
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES, default_ttl: float = DEFAULT_TTL_SECONDS,
+                 max_ttl: float = MAX_TTL_SECONDS, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str | None, str], dict] = OrderedDict()
+        self._bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0, "bypassed": 0, "scoped_hits": 0}
+
+    def _ttl(self, cache_control: dict) -> float:
+        if "no-cache" in cache_control:
+            return 0.0
+        try:
+            return min(float(cache_control["max-age"]), self.max_ttl)
+        except (KeyError, ValueError):
+            return self.default_ttl
+
+    def lookup(self, url: str, scope: str | None = None) -> tuple[str | None, str | None]:
+        """
+        Returns `(observation, None)` on a fresh hit, `(None, etag)` when a
+        stale entry can be revalidated, and `(None, None)` on a miss.
+        """
+        key = (scope, normalize_url(url))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None, None
+        self._entries.move_to_end(key)
+        if entry["expires_at"] > self._clock():
+            self.counters["hits"] += 1
+            if scope is not None:
+                self.counters["scoped_hits"] += 1
+            return entry["observation"], None
+        self.counters["misses"] += 1
+        if entry["etag"]:
+            return None, entry["etag"]
+        self._remove(key)
+        return None, None
+
+    def revalidated(self, url: str, headers: dict, scope: str | None = None) -> str | None:
+        """Marks a stale entry fresh again after a 304 and returns its observation."""
+        entry = self._entries.get((scope, normalize_url(url)))
+        if entry is None:
+            return None
+        entry["expires_at"] = self._clock() + self._ttl(parse_cache_control(headers))
+        self.counters["revalidated"] += 1
+        return entry["observation"]
+
+    def store(self, url: str, observation: str, headers: dict, scope: str | None = None):
+        """
+        Caches an observation unless the response's headers forbid it. Pass
+        every header, Set-Cookie included (Playwright's `response.all_headers()`;
+        `response.headers` leaves cookies out).
+        """
+        cache_control = parse_cache_control(headers)
+        if "no-store" in cache_control:
+            return
+        if scope is None and ("private" in cache_control or "set-cookie" in headers):
+            return
+        ttl = self._ttl(cache_control)
+        etag = headers.get("etag")
+        if ttl <= 0 and not etag:
+            return  # would never be servable
+        size = len(observation.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        key = (scope, normalize_url(url))
+        self._remove(key)
+        self._entries[key] = {"observation": observation, "etag": etag, "expires_at": self._clock() + ttl, "size": size}
+        self._bytes += size
+        self.counters["stores"] += 1
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.counters["evictions"] += 1
+
+    def drop_scope(self, scope: str):
+        """Forgets every entry stored under `scope`, e.g. when its session ends."""
+        for key in [key for key in self._entries if key[0] == scope]:
+            self._remove(key)
+
+    def _remove(self, key: tuple[str | None, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes, **self.counters}
+
+
+page_cache = PageCache()
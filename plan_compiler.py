@@ -0,0 +1,223 @@
+# in remo-backend/plan_compiler.py
+
+import re
+
+# rrweb event types and incremental sources the compiler understands.
+FULL_SNAPSHOT, INCREMENTAL_SNAPSHOT, META = 2, 3, 4
+MUTATION, MOUSE_INTERACTION, INPUT = 0, 2, 5
+CLICK = 2  # MouseInteractions.Click
+ELEMENT_NODE, TEXT_NODE = 2, 3
+
+# Attributes that usually survive redesigns, in order of preference.
+STABLE_ATTRIBUTES = ("data-testid", "data-test", "data-qa", "name", "aria-label", "placeholder", "title")
+# ids that look machine-generated (long digit runs, framework prefixes) make poor selectors.
+GENERATED_ID = re.compile(r"\d{3,}|^(ember|react|ng-|mui-|radix-|headlessui-|:r)")
+TEXT_SELECTOR_MAX = 60
+CSS_IDENTIFIER = re.compile(r"^-?[A-Za-z_][A-Za-z0-9_-]*$")
+
+
+def _css_string(value: str) -> str:
+    """A double-quoted CSS string. Non-ASCII stays literal: CSS has no \\uXXXX escape."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    escaped = re.sub(r"[\x00-\x1f\x7f]", lambda m: f"\\{ord(m.group()):x} ", escaped)
+    return f'"{escaped}"'
+
+
+def _id_selector(element_id: str) -> str:
+    # `#a.b` would mean id "a" with class "b", so anything that isn't a plain
+    # identifier goes through an attribute selector instead.
+    return f"#{element_id}" if CSS_IDENTIFIER.match(element_id) else f"[id={_css_string(element_id)}]"
+
+
+def _is_masked(node: dict, value: str) -> bool:
+    return node.get("attrs", {}).get("type") == "password" or (bool(value) and value.strip("*") == "")
+
+
+class ActionPlanCompiler:
+    """
+    Turns a live rrweb event stream into an action plan, one event at a time.
+
+    It keeps a lightweight mirror of the recorded DOM (rebuilt on every full
+    snapshot, patched by mutations) so that when a click or input arrives it
+    can describe the target with several selectors, most resilient first.
+    Consecutive inputs into the same field collapse into one `type` step.
+    Use it as a recording sink: call `add(event)` per event and `plan()` for
+    the steps so far.
+    """
+
+    def __init__(self):
+        self._nodes: dict[int, dict] = {}
+        self._steps: list[dict] = []
+        self._current_url: str | None = None
+
+    # --- DOM mirror ---
+
+    def _add_node(self, node: dict, parent_id: int | None, next_id: int | None = None):
+        node_id = node["id"]
+        self._nodes[node_id] = {
+            "type": node.get("type"),
+            "tag": (node.get("tagName") or "").lower(),
+            "attrs": dict(node.get("attributes") or {}),
+            "text": node.get("textContent") or "",
+            "parent": parent_id,
+            "children": [],
+        }
+        parent = self._nodes.get(parent_id)
+        if parent is not None:
+            siblings = parent["children"]
+            if next_id in siblings:
+                siblings.insert(siblings.index(next_id), node_id)
+            else:
+                siblings.append(node_id)
+        for child in node.get("childNodes") or []:
+            self._add_node(child, node_id)
+
+    def _remove_node(self, node_id: int):
+        node = self._nodes.pop(node_id, None)
+        if node is None:
+            return
+        parent = self._nodes.get(node["parent"])
+        if parent is not None and node_id in parent["children"]:
+            parent["children"].remove(node_id)
+        for child in node["children"]:
+            self._remove_node(child)
+
+    def _apply_mutation(self, data: dict):
+        for removal in data.get("removes") or []:
+            self._remove_node(removal["id"])
+        for addition in data.get("adds") or []:
+            self._add_node(addition["node"], addition.get("parentId"), addition.get("nextId"))
+        for change in data.get("attributes") or []:
+            node = self._nodes.get(change["id"])
+            if node is None:
+                continue
+            for name, value in (change.get("attributes") or {}).items():
+                if value is None:
+                    node["attrs"].pop(name, None)
+                elif isinstance(value, str):
+                    node["attrs"][name] = value
+        for change in data.get("texts") or []:
+            node = self._nodes.get(change["id"])
+            if node is not None:
+                node["text"] = change.get("value") or ""
+
+    def _text_of(self, node_id: int, limit: int = TEXT_SELECTOR_MAX) -> str:
+        parts, stack = [], [node_id]
+        while stack and sum(len(p) for p in parts) < limit:
+            node = self._nodes.get(stack.pop())
+            if node is None:
+                continue
+            if node["type"] == TEXT_NODE:
+                parts.append(node["text"])
+            elif node["tag"] not in ("script", "style"):
+                stack.extend(reversed(node["children"]))
+        return " ".join(" ".join(parts).split())[:limit]
+
+    # --- Selectors ---
+
+    def _css_path(self, node_id: int) -> str:
+        """A structural CSS path, anchored at the nearest ancestor with a usable id."""
+        segments = []
+        while node_id in self._nodes:
+            node = self._nodes[node_id]
+            if node["type"] != ELEMENT_NODE or node["tag"] in ("html", ""):
+                break
+            element_id = node["attrs"].get("id")
+            if element_id and not GENERATED_ID.search(element_id):
+                segments.append(_id_selector(element_id))
+                break
+            parent = self._nodes.get(node["parent"])
+            same_tag = [c for c in (parent["children"] if parent else []) if self._nodes.get(c, {}).get("tag") == node["tag"]]
+            segment = node["tag"]
+            if len(same_tag) > 1:
+                segment += f":nth-of-type({same_tag.index(node_id) + 1})"
+            segments.append(segment)
+            node_id = node["parent"]
+        return " > ".join(reversed(segments))
+
+    def selectors_for(self, node_id: int) -> list[str]:
+        """Playwright selectors for a recorded element, most resilient first."""
+        node = self._nodes.get(node_id)
+        if node is None:
+            return []
+        if node["type"] == TEXT_NODE:
+            return self.selectors_for(node["parent"])
+        tag, attrs = node["tag"], node["attrs"]
+        selectors = []
+        element_id = attrs.get("id")
+        if element_id and not GENERATED_ID.search(element_id):
+            selectors.append(_id_selector(element_id))
+        for name in STABLE_ATTRIBUTES:
+            if attrs.get(name):
+                selectors.append(f"{tag}[{name}={_css_string(attrs[name])}]")
+        text = self._text_of(node_id)
+        if text and (tag in ("a", "button", "label", "summary", "option") or attrs.get("role") in ("button", "link", "tab", "menuitem")):
+            selectors.append(f"{tag}:has-text({_css_string(text)})")
+        if tag == "a" and attrs.get("href"):
+            selectors.append(f"a[href={_css_string(attrs['href'])}]")
+        path = self._css_path(node_id)
+        if path:
+            selectors.append(path)
+        return list(dict.fromkeys(selectors))
+
+    # --- Steps ---
+
+    def add(self, event: dict):
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        if event_type == META:
+            href = data.get("href")
+            if href and href != self._current_url:
+                self._current_url = href
+                # Navigations after the first are normally caused by the previous
+                # step (a link click, a form submit), so replay should wait for them.
+                self._steps.append({"action": "navigate", "url": href, "implicit": bool(self._steps),
+                                    "timestamp": event.get("timestamp")})
+        elif event_type == FULL_SNAPSHOT:
+            self._nodes.clear()
+            self._add_node(data["node"], None)
+        elif event_type == INCREMENTAL_SNAPSHOT:
+            source = data.get("source")
+            if source == MUTATION:
+                self._apply_mutation(data)
+            elif source == MOUSE_INTERACTION and data.get("type") == CLICK:
+                self._add_click(data["id"], event.get("timestamp"))
+            elif source == INPUT:
+                self._add_input(data, event.get("timestamp"))
+
+    def _add_click(self, node_id: int, timestamp):
+        node = self._nodes.get(node_id, {})
+        # Clicks that focus or toggle a form field are covered by its input step.
+        if node.get("tag") in ("input", "textarea", "select") and node["attrs"].get("type") not in ("submit", "button", "image", "reset"):
+            return
+        self._steps.append({
+            "action": "click",
+            "selectors": self.selectors_for(node_id),
+            "text": self._text_of(node_id),
+            "timestamp": timestamp,
+        })
+
+    def _add_input(self, data: dict, timestamp):
+        node_id = data.get("id")
+        node = self._nodes.get(node_id, {})
+        selectors = self.selectors_for(node_id)
+        if "isChecked" in data and node.get("attrs", {}).get("type") in ("checkbox", "radio"):
+            step = {"action": "check", "checked": bool(data["isChecked"])}
+        elif node.get("tag") == "select":
+            step = {"action": "select", "value": data.get("text", "")}
+        elif _is_masked(node, data.get("text", "")):
+            # rrweb masks passwords (and any maskInputOptions fields) as '*'s;
+            # the real value was never recorded, so replay must not type it.
+            step = {"action": "type", "secret": True}
+        else:
+            step = {"action": "type", "value": data.get("text", "")}
+        step.update(selectors=selectors, node_id=node_id, timestamp=timestamp)
+        last = self._steps[-1] if self._steps else None
+        if last and last["action"] == step["action"] and last.get("node_id") == node_id:
+            self._steps[-1] = step  # keep only the field's final value
+        else:
+            self._steps.append(step)
+
+    def plan(self) -> list[dict]:
+        """The action plan compiled so far (node ids are recording-internal and left out)."""
+        return [{k: v for k, v in step.items() if k != "node_id"} for step in self._steps]
@@ -0,0 +1,363 @@
+# in remo-backend/recorder.py
+
+import asyncio
+import json
+import os
+import time
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # optional; only needed for the msgpack wire encodings
+    msgpack = None
+
+# The rrweb bundle served into recorded pages. A pre-minified build is used
+# when present next to the regular one; RRWEB_SCRIPT_PATH overrides both.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+RRWEB_SCRIPT_CANDIDATES = [
+    os.path.join(STATIC_DIR, "rrweb.min.js"),
+    os.path.join(STATIC_DIR, "rrweb.js"),
+]
+
+# Starts rrweb once per top-level document. Runs before the page's own
+# scripts on every navigation, so it waits for the DOM if it isn't there yet.
+RECORD_BOOTSTRAP_JS = """
+(() => {
+    if (window.top !== window || window.__remoRecording) return;
+    window.__remoRecording = true;
+    const start = () => rrweb.record(Object.assign({}, window.__remoRecordOptions || {}, {
+        emit(event) { window.send_event_to_backend(event); },
+    }));
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start, { once: true });
+    } else {
+        start();
+    }
+})();
+"""
+
+# Events are buffered and sent as one JSON array per frame: a frame goes out
+# when the window since its first event elapses or when it holds max events.
+BATCH_WINDOW_MS = int(os.getenv("RECORDER_BATCH_WINDOW_MS", "25"))
+BATCH_MAX_EVENTS = int(os.getenv("RECORDER_BATCH_MAX_EVENTS", "200"))
+# Upper bound on a client-requested batch window; longer windows only hold
+# events in server memory.
+MAX_BATCH_WINDOW_MS = 1000
+
+# Per-connection cap on buffered events. When a slow client lets the buffer
+# fill up, high-rate pointer/scroll events are coalesced and then dropped;
+# snapshots, mutations and input are always kept. A client that falls more
+# than OVERFLOW_FACTOR times the cap behind anyway is disconnected.
+MAX_BUFFERED_EVENTS = int(os.getenv("RECORDER_MAX_BUFFERED_EVENTS", "5000"))
+OVERFLOW_FACTOR = 2
+
+# rrweb event and incremental-source codes used by the overflow policy.
+INCREMENTAL_SNAPSHOT = 3
+MOUSE_MOVE, SCROLL, TOUCH_MOVE, DRAG = 1, 3, 6, 12
+DROPPABLE_SOURCES = {MOUSE_MOVE, SCROLL, TOUCH_MOVE, DRAG}
+
+
+# Wire encodings a recording client can ask for with ?encoding=. "json" sends
+# text frames; the others send one binary frame per batch, compressed on its
+# own so each frame can be decoded independently.
+WIRE_ENCODINGS = ("json", "json+deflate", "msgpack", "msgpack+deflate")
+DEFLATE_LEVEL = int(os.getenv("RECORDER_DEFLATE_LEVEL", "6"))
+
+
+def make_frame_encoder(encoding: str):
+    """
+    Returns `encode(batch) -> str | bytes` for a wire encoding. A str result is
+    sent as a text frame and bytes as a binary frame.
+    """
+    if encoding not in WIRE_ENCODINGS:
+        raise ValueError(f"Unknown recording encoding '{encoding}'; expected one of {', '.join(WIRE_ENCODINGS)}.")
+    if encoding.startswith("msgpack") and msgpack is None:
+        raise ValueError("The msgpack encodings need the 'msgpack' package, which is not installed on the server.")
+
+    if encoding == "json":
+        return lambda batch: json.dumps(batch, separators=(",", ":"))
+    if encoding == "json+deflate":
+        return lambda batch: zlib.compress(json.dumps(batch, separators=(",", ":")).encode("utf-8"), DEFLATE_LEVEL)
+    if encoding == "msgpack":
+        return lambda batch: msgpack.packb(batch)
+    return lambda batch: zlib.compress(msgpack.packb(batch), DEFLATE_LEVEL)
+
+
+class SlowClientError(Exception):
+    """Raised by EventBatcher.run() when a client falls too far behind."""
+
+
+def _incremental_source(event) -> int | None:
+    if isinstance(event, dict) and event.get("type") == INCREMENTAL_SNAPSHOT:
+        return (event.get("data") or {}).get("source")
+    return None
+
+
+_init_script: str | None = None
+
+# Totals across all recording sessions since startup, for /metrics/recording.
+recording_metrics = {"active_sessions": 0, "sessions": 0, "events": 0, "frames": 0, "bytes": 0, "coalesced": 0, "dropped": 0}
+
+
+def rrweb_record_options(mousemove_ms: int | None = None, mouse_interaction: bool = True,
+                         scroll_ms: int | None = None, input_mode: str | None = None,
+                         checkout_every_n: int | None = None, checkout_every_ms: int | None = None) -> dict:
+    """
+    Translates Remo's sampling settings into options for `rrweb.record()`.
+    Unset values keep rrweb's defaults; a mousemove interval of 0 turns mouse
+    movement recording off.
+    """
+    sampling = {}
+    if mousemove_ms is not None:
+        sampling["mousemove"] = mousemove_ms if mousemove_ms > 0 else False
+    if not mouse_interaction:
+        sampling["mouseInteraction"] = False
+    if scroll_ms is not None:
+        sampling["scroll"] = scroll_ms
+    if input_mode is not None:
+        sampling["input"] = input_mode
+    options = {"sampling": sampling} if sampling else {}
+    if checkout_every_n:
+        options["checkoutEveryNth"] = checkout_every_n
+    if checkout_every_ms:
+        options["checkoutEveryNms"] = checkout_every_ms
+    return options
+
+
+def record_options_script(options: dict) -> str:
+    """Init script that hands per-session options to RECORD_BOOTSTRAP_JS."""
+    return f"window.__remoRecordOptions = {json.dumps(options)};"
+
+
+def load_recorder_script() -> str:
+    """
+    Reads the rrweb bundle from disk once and builds the init script injected
+    into every recorded page. Later calls return the cached script.
+    """
+    global _init_script
+    if _init_script is not None:
+        return _init_script
+    candidates = [os.environ["RRWEB_SCRIPT_PATH"]] if os.getenv("RRWEB_SCRIPT_PATH") else RRWEB_SCRIPT_CANDIDATES
+    for path in candidates:
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                rrweb_source = f.read()
+            _init_script = rrweb_source + "\n;" + RECORD_BOOTSTRAP_JS
+            print(f"OK: Loaded recorder script from {path} ({len(rrweb_source) // 1024} KiB).")
+            return _init_script
+    raise FileNotFoundError(f"rrweb script not found (looked in: {', '.join(candidates)})")
+
+
+class EventBatcher:
+    """
+    Coalesces rrweb events into array frames for one WebSocket.
+
+    `add()` is synchronous and never waits on the socket, so the page bridge
+    is not held up by a slow client; `run()` drains the buffer and hands each
+    batch to `send(batch)`, which returns the number of bytes it wrote.
+
+    The buffer holds at most `max_buffered` events; see `_shed()` for what
+    happens when a slow client lets it fill up.
+    """
+
+    def __init__(self, send, window_ms: int = BATCH_WINDOW_MS, max_events: int = BATCH_MAX_EVENTS,
+                 max_buffered: int = MAX_BUFFERED_EVENTS):
+        self._send = send
+        self.window = min(max(window_ms, 0), MAX_BATCH_WINDOW_MS) / 1000
+        self.max_buffered = max(max_buffered, 1)
+        # A frame can never be larger than the buffer cap.
+        self.max_events = min(max(max_events, 1), self.max_buffered)
+        self._buffer: list = []
+        self._droppable = 0  # buffered events in DROPPABLE_SOURCES, so a full buffer with none skips _shed()
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closed = False
+        self.events = 0
+        self.frames = 0
+        self.bytes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._too_slow = False
+        self._started = time.perf_counter()
+
+    def add(self, event):
+        if self._closed:
+            return
+        droppable = _incremental_source(event) in DROPPABLE_SOURCES
+        if len(self._buffer) >= self.max_buffered:
+            if self._droppable:
+                self._shed()
+            if len(self._buffer) >= self.max_buffered and droppable:
+                self.dropped += 1
+                return
+            if len(self._buffer) >= self.max_buffered * OVERFLOW_FACTOR:
+                self._too_slow = True
+                self.close()
+                return
+        self._buffer.append(event)
+        self._droppable += droppable
+        self._pending.set()
+        if len(self._buffer) >= self.max_events:
+            self._full.set()
+
+    def _shed(self):
+        """
+        Makes room in a full buffer. First coalesces: only the latest
+        mouse/touch move and the latest scroll per element are kept. If that
+        isn't enough, drops the oldest remaining droppable events until an
+        eighth of the buffer is free, so the O(n) pass is paid once per many
+        events. Snapshots, mutations, clicks and input are never touched.
+        """
+        kept, seen = [], set()
+        for event in reversed(self._buffer):
+            source = _incremental_source(event)
+            if source in (MOUSE_MOVE, TOUCH_MOVE, SCROLL):
+                key = (source, event["data"].get("id")) if source == SCROLL else (source,)
+                if key in seen:
+                    self.coalesced += 1
+                    continue
+                seen.add(key)
+            kept.append(event)
+        kept.reverse()
+        excess = len(kept) - self.max_buffered + max(self.max_buffered // 8, 1)
+        if excess > 0:
+            compacted = []
+            for event in kept:
+                if excess > 0 and _incremental_source(event) in DROPPABLE_SOURCES:
+                    excess -= 1
+                    self.dropped += 1
+                    continue
+                compacted.append(event)
+            kept = compacted
+        self._buffer = kept
+        self._droppable = sum(1 for event in kept if _incremental_source(event) in DROPPABLE_SOURCES)
+
+    def close(self):
+        """Stops accepting events; `run()` flushes what's left and returns."""
+        self._closed = True
+        self._pending.set()
+        self._full.set()
+
+    async def run(self):
+        while True:
+            await self._pending.wait()
+            if not self._closed and len(self._buffer) < self.max_events:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._buffer = self._buffer[:self.max_events], self._buffer[self.max_events:]
+            self._droppable -= sum(1 for event in batch if _incremental_source(event) in DROPPABLE_SOURCES)
+            if not self._buffer:
+                self._pending.clear()
+            if len(self._buffer) < self.max_events and not self._closed:
+                self._full.clear()
+            if batch:
+                sent = await self._send(batch)
+                self.events += len(batch)
+                self.frames += 1
+                self.bytes += sent
+            if self._closed and not self._buffer:
+                if self._too_slow:
+                    raise SlowClientError(f"client fell more than {self.max_buffered * OVERFLOW_FACTOR} events behind")
+                return
+
+    def stats(self) -> dict:
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        return {
+            "events": self.events,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "events_per_frame": self.events / self.frames if self.frames else 0.0,
+            "frames_per_second": self.frames / elapsed,
+            "bytes_per_second": self.bytes / elapsed,
+        }
+
+
+# Headless recording: instead of a headed window on the server, the page is
+# streamed to the client as a CDP screencast of JPEG frames and the client's
+# mouse/keyboard input is dispatched back into the page. RECORDER_MODE sets the
+# default for connections that don't ask for a mode.
+RECORDER_MODES = ("headed", "headless")
+RECORDER_MODE = os.getenv("RECORDER_MODE", "headed")
+# Recording sessions with no rrweb events or client input for this long are closed.
+RECORDER_IDLE_TIMEOUT = float(os.getenv("RECORDER_IDLE_TIMEOUT", "900"))
+SCREENCAST_QUALITY = int(os.getenv("RECORDER_SCREENCAST_QUALITY", "60"))
+SCREENCAST_FPS = float(os.getenv("RECORDER_SCREENCAST_FPS", "10"))
+SCREENCAST_MAX_WIDTH = int(os.getenv("RECORDER_SCREENCAST_MAX_WIDTH", "1280"))
+SCREENCAST_MAX_HEIGHT = int(os.getenv("RECORDER_SCREENCAST_MAX_HEIGHT", "800"))
+# The only CDP methods a client may invoke through the recording socket.
+CLIENT_INPUT_METHODS = {"Input.dispatchMouseEvent", "Input.dispatchKeyEvent", "Input.insertText", "Input.dispatchTouchEvent"}
+
+
+class Screencast:
+    """
+    Streams a page's CDP screencast to the client as
+    `{"type": "screencast", "data": <base64 JPEG>, "metadata": {...}}` text
+    frames (rrweb batches are always arrays or binary, so clients can tell them
+    apart). Chrome only produces the next frame after the previous one is
+    acknowledged, so acks are delayed to hold the stream at `fps` and are sent
+    only once the frame is on the wire, giving natural backpressure.
+    """
+
+    def __init__(self, cdp, send_message, quality: int = SCREENCAST_QUALITY, fps: float = SCREENCAST_FPS,
+                 max_width: int = SCREENCAST_MAX_WIDTH, max_height: int = SCREENCAST_MAX_HEIGHT):
+        self._cdp = cdp
+        self._send = send_message
+        self.quality = min(max(quality, 1), 100)
+        self.interval = 1 / max(fps, 0.1)
+        self.max_width = max_width
+        self.max_height = max_height
+        self.frames = 0
+        self.bytes = 0
+
+    async def start(self):
+        self._cdp.on("Page.screencastFrame", self._on_frame)
+        await self._cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": self.quality,
+            "maxWidth": self.max_width,
+            "maxHeight": self.max_height,
+        })
+
+    async def stop(self):
+        try:
+            await self._cdp.send("Page.stopScreencast")
+        except Exception:
+            pass  # the page or browser is already gone
+
+    async def _on_frame(self, params: dict):
+        started = time.perf_counter()
+        try:
+            sent = await self._send({"type": "screencast", "data": params["data"], "metadata": params.get("metadata", {})})
+            self.frames += 1
+            self.bytes += sent
+            await asyncio.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+            await self._cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+        except Exception:
+            pass  # client or page went away; the session is shutting down
+
+
+async def forward_client_input(cdp, receive_text):
+    """
+    Reads `{"type": "input", "method": "Input.*", "params": {...}}` messages
+    from the client and dispatches them into the page over CDP. Returns when
+    the client disconnects.
+    """
+    while True:
+        try:
+            message = json.loads(await receive_text())
+        except (ValueError, TypeError):
+            continue
+        if not isinstance(message, dict) or message.get("type") != "input":
+            continue
+        method = message.get("method")
+        if method not in CLIENT_INPUT_METHODS:
+            print(f"--- Recorder Tool: Ignoring client input method {method!r} ---")
+            continue
+        try:
+            await cdp.send(method, message.get("params") or {})
+        except Exception as e:
+            print(f"--- Recorder Tool: Could not dispatch {method}: {e} ---")
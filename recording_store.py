@@ -0,0 +1,152 @@
+# in remo-backend/recording_store.py
+
+import asyncio
+import json
+import os
+import re
+import secrets
+import zlib
+from datetime import datetime, timezone
+
+# Recordings live under RECORDINGS_DIR/<task_id>/<recording_id>/ as numbered
+# segment files. Each flush appends one self-contained gzip member of JSON
+# lines to the current segment, so a crash loses at most the last unflushed
+# interval and a torn final member is simply skipped on read.
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "recordings")
+FLUSH_INTERVAL_SECONDS = float(os.getenv("RECORDING_FLUSH_INTERVAL", "1.0"))
+FLUSH_MAX_EVENTS = int(os.getenv("RECORDING_FLUSH_MAX_EVENTS", "1000"))
+SEGMENT_MAX_BYTES = int(os.getenv("RECORDING_SEGMENT_MAX_BYTES", str(8 * 1024 * 1024)))
+COMPLETE_MARKER = "COMPLETE"
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.\-]+$")
+
+
+def _checked_id(value: str) -> str:
+    # Ids become path components, so refuse anything that could escape the store.
+    if not _SAFE_ID.match(value) or value in (".", ".."):
+        raise ValueError(f"Invalid recording path component: {value!r}")
+    return value
+
+
+def _gzip_member(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    return compressor.compress(data) + compressor.flush()
+
+
+class RecordingWriter:
+    """
+    Streams one recording session's rrweb events to disk as they arrive.
+
+    `add()` only buffers; a background task writes the buffer every
+    FLUSH_INTERVAL_SECONDS (or FLUSH_MAX_EVENTS) and fsyncs once per flush,
+    off the event loop. Use as `async with RecordingWriter(task_id) as writer:`.
+    """
+
+    def __init__(self, task_id: str, root: str = RECORDINGS_DIR, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 flush_max_events: int = FLUSH_MAX_EVENTS, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.task_id = _checked_id(task_id)
+        self.recording_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + secrets.token_hex(3)
+        self.path = os.path.join(root, self.task_id, self.recording_id)
+        self.flush_interval = flush_interval
+        self.flush_max_events = flush_max_events
+        self.segment_max_bytes = segment_max_bytes
+        self._buffer: list = []
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._flusher: asyncio.Task | None = None
+        self._segment = 0
+        self._segment_bytes = 0
+        self.events_written = 0
+
+    async def __aenter__(self):
+        await asyncio.to_thread(os.makedirs, self.path, exist_ok=True)
+        self._flusher = asyncio.create_task(self._run())
+        print(f"--- Recording Store: Writing task {self.task_id} to {self.path} ---")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._closed = True
+        self._wakeup.set()
+        await self._flusher
+        await asyncio.to_thread(self._mark_complete)
+        print(f"--- Recording Store: Saved {self.events_written} events for task {self.task_id} ---")
+
+    def add(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.flush_max_events:
+            self._wakeup.set()
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+        await self._flush()
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, batch)
+        self.events_written += len(batch)
+
+    def _write(self, batch: list):
+        member = _gzip_member("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in batch).encode("utf-8"))
+        if self._segment == 0 or self._segment_bytes + len(member) > self.segment_max_bytes:
+            self._segment += 1
+            self._segment_bytes = 0
+        with open(os.path.join(self.path, f"{self._segment:06d}.jsonl.gz"), "ab") as f:
+            f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+        self._segment_bytes += len(member)
+
+    def _mark_complete(self):
+        with open(os.path.join(self.path, COMPLETE_MARKER), "w") as f:
+            f.write(json.dumps({"events": self.events_written, "segments": self._segment}))
+
+
+def list_recordings(task_id: str, root: str = RECORDINGS_DIR) -> list[dict]:
+    """Lists a task's recordings, oldest first."""
+    task_dir = os.path.join(root, _checked_id(task_id))
+    if not os.path.isdir(task_dir):
+        return []
+    recordings = []
+    for recording_id in sorted(os.listdir(task_dir)):
+        path = os.path.join(task_dir, recording_id)
+        segments = sorted(name for name in os.listdir(path) if name.endswith(".jsonl.gz"))
+        recordings.append({
+            "recording_id": recording_id,
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(os.path.join(path, name)) for name in segments),
+            "complete": os.path.exists(os.path.join(path, COMPLETE_MARKER)),
+        })
+    return recordings
+
+
+def read_events(task_id: str, recording_id: str, root: str = RECORDINGS_DIR):
+    """
+    Yields a recording's events in order. Works on recordings that are still
+    being written or were cut short by a crash: a trailing partial gzip member
+    is ignored.
+    """
+    path = os.path.join(root, _checked_id(task_id), _checked_id(recording_id))
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No recording {recording_id} for task {task_id}")
+    for name in sorted(n for n in os.listdir(path) if n.endswith(".jsonl.gz")):
+        with open(os.path.join(path, name), "rb") as f:
+            data = f.read()
+        while data:
+            decompressor = zlib.decompressobj(31)
+            try:
+                chunk = decompressor.decompress(data)
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break  # torn write at the end of the segment
+            for line in chunk.decode("utf-8").splitlines():
+                yield json.loads(line)
+            data = decompressor.unused_data
@@ -0,0 +1,109 @@
+# in remo-backend/replay.py
+
+import asyncio
+import os
+import time
+
+# How long one step may take, including waiting for its target to appear.
+STEP_TIMEOUT_MS = int(os.getenv("REPLAY_STEP_TIMEOUT_MS", "10000"))
+SELECTOR_POLL_SECONDS = 0.1
+REPLAY_ACTIONS = ("navigate", "click", "type", "select", "check")
+
+
+class ReplayStepError(Exception):
+    """Raised when a step of an action plan can't be carried out."""
+
+
+def plan_error(plan) -> str | None:
+    """Describes why `plan` can't be replayed, or returns None if every step is well-formed."""
+    if not isinstance(plan, list):
+        return "action plan must be a list of steps"
+    for index, step in enumerate(plan):
+        if not isinstance(step, dict) or step.get("action") not in REPLAY_ACTIONS:
+            return f"step {index} is not an object with an action in {', '.join(REPLAY_ACTIONS)}"
+        if step["action"] == "navigate" and not isinstance(step.get("url"), str):
+            return f"step {index} navigates without a url"
+    return None
+
+
+async def _find_target(page, selectors: list[str], timeout_ms: int):
+    """
+    Returns a locator for the first selector (in the plan's preference order)
+    that matches an element, polling until the step timeout runs out.
+    """
+    if not selectors:
+        raise ReplayStepError("step has no selectors")
+    deadline = time.monotonic() + timeout_ms / 1000
+    while True:
+        for selector in selectors:
+            try:
+                locator = page.locator(selector).first
+                if await locator.count() > 0:
+                    return locator, selector
+            except Exception:
+                continue  # a selector this Playwright version can't parse; try the next
+        if time.monotonic() >= deadline:
+            raise ReplayStepError(f"no element matched any of {len(selectors)} selectors")
+        await asyncio.sleep(SELECTOR_POLL_SECONDS)
+
+
+async def _run_step(page, step: dict, timeout_ms: int) -> str:
+    action = step["action"]
+    if action == "navigate":
+        if step.get("implicit"):
+            # Caused by the previous step; wait for it, and only load the URL
+            # ourselves if the page didn't get there on its own.
+            try:
+                await page.wait_for_url(step["url"], timeout=timeout_ms)
+                return f"arrived at {step['url']}"
+            except Exception:
+                pass
+        await page.goto(step["url"], wait_until="domcontentloaded", timeout=timeout_ms)
+        return f"navigated to {step['url']}"
+
+    if step.get("secret"):
+        # The recording only saw a masked value (e.g. a password), so hand over.
+        raise ReplayStepError("step needs a secret value that was masked in the recording")
+    locator, selector = await _find_target(page, step.get("selectors") or [], timeout_ms)
+    if action == "click":
+        await locator.click(timeout=timeout_ms)
+    elif action == "type":
+        await locator.fill(step.get("value", ""), timeout=timeout_ms)
+    elif action == "select":
+        await locator.select_option(step.get("value", ""), timeout=timeout_ms)
+    else:  # check
+        await locator.set_checked(bool(step.get("checked")), timeout=timeout_ms)
+    return f"{action} {selector}"
+
+
+async def replay_action_plan(page, plan: list[dict], step_timeout_ms: int = STEP_TIMEOUT_MS) -> dict:
+    """
+    Executes a stored action plan directly with Playwright, no model calls.
+    Stops at the first failing step. Returns a result with a per-step log,
+    and on failure the index and error of the step that broke. Raises
+    ValueError if the plan is malformed (see `plan_error`).
+    """
+    error = plan_error(plan)
+    if error:
+        raise ValueError(error)
+    log = []
+    started = time.perf_counter()
+    for index, step in enumerate(plan):
+        try:
+            detail = await _run_step(page, step, step_timeout_ms)
+        except Exception as e:
+            log.append({"step": index, "action": step["action"], "status": "failed", "error": str(e)})
+            print(f"--- Replay: Step {index} ({step['action']}) failed: {e} ---")
+            return {
+                "status": "failed",
+                "steps_completed": index,
+                "failed_step": index,
+                "error": str(e),
+                "url": page.url,
+                "log": log,
+                "seconds": time.perf_counter() - started,
+            }
+        log.append({"step": index, "action": step["action"], "status": "ok", "detail": detail})
+    print(f"--- Replay: Completed {len(plan)} steps in {time.perf_counter() - started:.2f}s ---")
+    return {"status": "success", "steps_completed": len(plan), "url": page.url, "log": log,
+            "seconds": time.perf_counter() - started}
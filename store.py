@@ -0,0 +1,417 @@
+# in remo-backend/store.py
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+# Plain synchronous queries against the Remo schema. Each takes an open
+# connection as its first argument so it can be run through
+# `AsyncDatabase.read()` / `AsyncDatabase.write()` off the event loop.
+# Write helpers never commit; the caller owns the transaction.
+
+TASK_COLUMNS = (
+    "id", "user_id", "title", "notes", "url", "due_time", "repeat_rule", "priority",
+    "is_flagged", "tags_csv", "early_reminder_offset_mins", "status", "is_training_required",
+    "action_plan_json", "training_transcript", "creation_date", "last_run_log",
+    "recording_sampling_json", "updated_at", "compiled_plan_json",
+)
+# Large per-task blobs, left out of list responses unless asked for by name.
+HEAVY_TASK_COLUMNS = (
+    "action_plan_json", "training_transcript", "last_run_log", "recording_sampling_json", "compiled_plan_json",
+)
+LIST_TASK_COLUMNS = tuple(col for col in TASK_COLUMNS if col not in HEAVY_TASK_COLUMNS)
+BOOL_TASK_COLUMNS = ("is_flagged", "is_training_required")
+# Columns a bulk update may set.
+UPDATABLE_TASK_COLUMNS = (
+    "title", "notes", "url", "due_time", "repeat_rule", "priority", "is_flagged", "tags_csv",
+    "early_reminder_offset_mins", "status",
+)
+
+
+# --- Schema migrations ---
+# Applied in order by `db.migrate()`, which tracks progress in PRAGMA user_version.
+# Never edit a released migration; append a new one instead.
+
+def _convert_legacy_tasks(db: sqlite3.Connection):
+    """
+    Databases from before migrations were tracked have a smaller 'tasks'
+    table (a `goal` column, no `creation_date`). Move its rows aside so
+    migration 1 can create the current table and copy them back in.
+    """
+    legacy_columns = [row[1] for row in db.execute("PRAGMA table_info(tasks)")]
+    if not legacy_columns or "creation_date" in legacy_columns:
+        return None
+    print("DB: Converting legacy 'tasks' table...")
+    db.execute("ALTER TABLE tasks RENAME TO tasks_legacy")
+    return legacy_columns
+
+
+def create_schema(db: sqlite3.Connection):
+    """Migration 1: the 'tasks' and 'push_tokens' tables."""
+    legacy_columns = _convert_legacy_tasks(db)
+    print("DB: Creating 'tasks' table...")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            title TEXT NOT NULL,
+            notes TEXT,
+            url TEXT,
+            due_time TEXT,
+            repeat_rule TEXT,
+            priority TEXT,
+            is_flagged BOOLEAN,
+            tags_csv TEXT,
+            early_reminder_offset_mins INTEGER,
+            status TEXT NOT NULL,
+            is_training_required BOOLEAN,
+            action_plan_json TEXT,
+            training_transcript TEXT,
+            creation_date TEXT NOT NULL,
+            last_run_log TEXT
+        )
+    """)
+    if legacy_columns is not None:
+        current = [row[1] for row in db.execute("PRAGMA table_info(tasks)")]
+        copied = {col: col for col in legacy_columns if col in current}
+        if "goal" in legacy_columns and "notes" not in copied:
+            copied["notes"] = "goal"
+        db.execute(
+            f"INSERT INTO tasks ({', '.join(copied)}, creation_date) "
+            f"SELECT {', '.join(copied.values())}, ? FROM tasks_legacy",
+            (datetime.now(timezone.utc).isoformat(),),
+        )
+        db.execute("DROP TABLE tasks_legacy")
+    print("DB: Creating 'push_tokens' table...")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS push_tokens (
+            user_id TEXT PRIMARY KEY,
+            token TEXT NOT NULL
+        )
+    """)
+
+
+def add_hot_query_indexes(db: sqlite3.Connection):
+    """Migration 2: indexes for the reminder scan and the per-user listing."""
+    # Partial index: only pending rows are ever scanned by the scheduler, so
+    # notified/trained tasks don't bloat it.
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_pending_due ON tasks (due_time) WHERE status = 'pending'")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks (user_id, creation_date)")
+
+
+def add_recording_sampling(db: sqlite3.Connection):
+    """Migration 3: per-task rrweb sampling settings for recording sessions."""
+    db.execute("ALTER TABLE tasks ADD COLUMN recording_sampling_json TEXT")
+
+
+def add_listing_cursor_index(db: sqlite3.Connection):
+    """Migration 4: let keyset-paginated listings walk (creation_date, id) straight off the index."""
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_created_id ON tasks (user_id, creation_date, id)")
+    db.execute("DROP INDEX IF EXISTS idx_tasks_user_created")
+
+
+def add_change_tracking(db: sqlite3.Connection):
+    """Migration 5: tasks.updated_at and task tombstones, for incremental sync."""
+    db.execute("ALTER TABLE tasks ADD COLUMN updated_at TEXT")
+    db.execute("UPDATE tasks SET updated_at = creation_date")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_updated ON tasks (user_id, updated_at, id)")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            deleted_at TEXT NOT NULL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_tombstones_user_deleted ON task_tombstones (user_id, deleted_at, id)")
+
+
+def add_compiled_plan(db: sqlite3.Connection):
+    """Migration 6: keep plans compiled from recordings apart from the trained action plan."""
+    db.execute("ALTER TABLE tasks ADD COLUMN compiled_plan_json TEXT")
+
+
+MIGRATIONS = [
+    (1, "create tasks and push_tokens tables", create_schema),
+    (2, "index pending reminders and per-user listing", add_hot_query_indexes),
+    (3, "add tasks.recording_sampling_json", add_recording_sampling),
+    (4, "index per-user listing by (creation_date, id)", add_listing_cursor_index),
+    (5, "add tasks.updated_at and task_tombstones", add_change_tracking),
+    (6, "add tasks.compiled_plan_json", add_compiled_plan),
+]
+
+INSERT_TASK_SQL = f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join('?' for _ in TASK_COLUMNS)})"
+
+# Hot queries, kept as constants so tests can check their query plans.
+# The listing is newest first; `{columns}` is filled from a validated projection.
+LIST_TASKS_SQL = "SELECT {columns} FROM tasks WHERE user_id = ? ORDER BY creation_date DESC, id DESC LIMIT ?"
+LIST_TASKS_AFTER_SQL = """
+    SELECT {columns} FROM tasks
+    WHERE user_id = ? AND (creation_date, id) < (?, ?)
+    ORDER BY creation_date DESC, id DESC LIMIT ?
+"""
+# Incremental sync: everything changed or deleted after an (updated_at, id) cursor.
+CHANGED_TASKS_SQL = """
+    SELECT {columns} FROM tasks
+    WHERE user_id = ? AND (updated_at, id) > (?, ?)
+    ORDER BY updated_at, id LIMIT ?
+"""
+DELETED_TASKS_SQL = """
+    SELECT id, deleted_at FROM task_tombstones
+    WHERE user_id = ? AND (deleted_at, id) > (?, ?)
+    ORDER BY deleted_at, id LIMIT ?
+"""
+DUE_REMINDERS_SQL = """
+    SELECT t.id, t.user_id, t.title, p.token
+    FROM tasks AS t
+    JOIN push_tokens AS p ON p.user_id = t.user_id
+    WHERE t.due_time <= ? AND t.status = 'pending'
+"""
+
+# SQLite caps the number of bound parameters per statement (999 on older
+# builds), so large IN (...) lists are split into chunks of this size.
+MAX_IN_PARAMS = 900
+
+
+_last_stamp = ""
+
+
+def change_stamp() -> str:
+    """
+    The `updated_at` / `deleted_at` value for a write. Strictly increasing, so
+    sync cursors never skip a change; writes all run on AsyncDatabase's single
+    writer thread, so no lock is needed.
+    """
+    global _last_stamp
+    stamp = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+    if stamp <= _last_stamp:
+        stamp = (datetime.fromisoformat(_last_stamp) + timedelta(microseconds=1)).isoformat(timespec="microseconds")
+    _last_stamp = stamp
+    return stamp
+
+
+def _task_dicts(columns: tuple, rows: list) -> list[dict]:
+    tasks = [dict(zip(columns, row)) for row in rows]
+    for col in BOOL_TASK_COLUMNS:
+        if col in columns:
+            for task in tasks:
+                task[col] = bool(task[col])
+    return tasks
+
+
+# --- Tasks ---
+
+def insert_task(db: sqlite3.Connection, task: dict) -> str:
+    """Inserts a task, stamping its updated_at. Returns the stamp."""
+    task = {**task, "updated_at": change_stamp()}
+    db.execute(INSERT_TASK_SQL, tuple(task[col] for col in TASK_COLUMNS))
+    return task["updated_at"]
+
+
+def insert_tasks(db: sqlite3.Connection, tasks: list[dict]) -> dict[int, str]:
+    """
+    Inserts many tasks with one executemany, all stamped with the same
+    updated_at. If any row violates a constraint the batch is undone and
+    retried row by row, so the others still go in. Returns `{index: error}`
+    for the rows that failed.
+    """
+    stamp = change_stamp()
+    rows = [tuple(stamp if col == "updated_at" else task[col] for col in TASK_COLUMNS) for task in tasks]
+    db.execute("SAVEPOINT insert_tasks")
+    try:
+        db.executemany(INSERT_TASK_SQL, rows)
+    except sqlite3.IntegrityError:
+        db.execute("ROLLBACK TO insert_tasks")
+    else:
+        db.execute("RELEASE insert_tasks")
+        return {}
+    db.execute("RELEASE insert_tasks")
+    failed = {}
+    for index, row in enumerate(rows):
+        try:
+            db.execute(INSERT_TASK_SQL, row)
+        except sqlite3.IntegrityError as e:
+            failed[index] = str(e)
+    return failed
+
+
+def update_tasks(db: sqlite3.Connection, updates: list[dict]) -> dict[int, str]:
+    """
+    Applies partial updates, each `{"id": ..., <column>: <value>, ...}` with
+    columns from UPDATABLE_TASK_COLUMNS, in request order. Each run of
+    consecutive updates that set the same columns shares one executemany.
+    Returns `{index: error}` for the ones not applied.
+    """
+    existing = {task["id"] for task in tasks_by_ids(db, [update["id"] for update in updates], ("id",))}
+    stamp, failed, runs = change_stamp(), {}, []
+    for index, update in enumerate(updates):
+        columns = tuple(sorted(col for col in update if col != "id"))
+        if update["id"] not in existing:
+            failed[index] = "Task not found"
+        elif not columns:
+            failed[index] = "No fields to update"
+        elif any(col not in UPDATABLE_TASK_COLUMNS for col in columns):
+            raise ValueError(f"Not an updatable task column: {columns}")
+        else:
+            if not runs or runs[-1][0] != columns:
+                runs.append((columns, []))
+            runs[-1][1].append((*(update[col] for col in columns), stamp, update["id"]))
+    for columns, rows in runs:
+        assignments = ", ".join(f"{col} = ?" for col in (*columns, "updated_at"))
+        db.executemany(f"UPDATE tasks SET {assignments} WHERE id = ?", rows)
+    return failed
+
+
+def list_tasks(db: sqlite3.Connection, user_id: str, columns: tuple = LIST_TASK_COLUMNS,
+               limit: int = 50, after: tuple | None = None) -> list[dict]:
+    """
+    Returns one page of a user's tasks, newest first, with only `columns`
+    (which must come from TASK_COLUMNS). `after` is the `(creation_date, id)`
+    of the last task on the previous page.
+    """
+    column_sql = ", ".join(columns)
+    if after is None:
+        rows = db.execute(LIST_TASKS_SQL.format(columns=column_sql), (user_id, limit)).fetchall()
+    else:
+        rows = db.execute(LIST_TASKS_AFTER_SQL.format(columns=column_sql), (user_id, *after, limit)).fetchall()
+    return _task_dicts(columns, rows)
+
+
+def task_changes(db: sqlite3.Connection, user_id: str, after: tuple, columns: tuple = LIST_TASK_COLUMNS,
+                 limit: int = 500) -> tuple[list[dict], list[str], tuple | None, bool]:
+    """
+    Returns up to `limit` of a user's changes after the `(updated_at, id)`
+    cursor key, oldest first: `(tasks, deleted_ids, last_key, has_more)`.
+    `last_key` is the cursor key to resume from, or None if nothing changed.
+    """
+    columns = tuple(dict.fromkeys([*columns, "id", "updated_at"]))
+    tasks = _task_dicts(columns, db.execute(
+        CHANGED_TASKS_SQL.format(columns=", ".join(columns)), (user_id, *after, limit)
+    ).fetchall())
+    tombstones = db.execute(DELETED_TASKS_SQL, (user_id, *after, limit)).fetchall()
+    entries = sorted(
+        [((task["updated_at"], task["id"]), task) for task in tasks]
+        + [((deleted_at, task_id), task_id) for task_id, deleted_at in tombstones],
+        key=lambda entry: entry[0],
+    )
+    has_more = len(entries) > limit or len(tasks) == limit or len(tombstones) == limit
+    entries = entries[:limit]
+    return (
+        [item for _, item in entries if isinstance(item, dict)],
+        [item for _, item in entries if isinstance(item, str)],
+        entries[-1][0] if entries else None,
+        has_more,
+    )
+
+
+def tasks_by_ids(db: sqlite3.Connection, task_ids: list[str], columns: tuple = LIST_TASK_COLUMNS) -> list[dict]:
+    tasks = []
+    for i in range(0, len(task_ids), MAX_IN_PARAMS):
+        chunk = task_ids[i:i + MAX_IN_PARAMS]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = db.execute(f"SELECT {', '.join(columns)} FROM tasks WHERE id IN ({placeholders})", chunk).fetchall()
+        tasks += _task_dicts(columns, rows)
+    return tasks
+
+
+def get_task(db: sqlite3.Connection, task_id: str) -> dict | None:
+    cursor = db.cursor()
+    cursor.row_factory = sqlite3.Row
+    row = cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def save_training(db: sqlite3.Connection, task_id: str, action_plan_json: str, transcript: str) -> bool:
+    """Stores a training result. Returns False if the task doesn't exist."""
+    cursor = db.execute(
+        "UPDATE tasks SET action_plan_json = ?, training_transcript = ?, status = 'trained', updated_at = ? WHERE id = ?",
+        (action_plan_json, transcript, change_stamp(), task_id),
+    )
+    return cursor.rowcount > 0
+
+
+def save_compiled_plan(db: sqlite3.Connection, task_id: str, compiled_plan_json: str) -> bool:
+    """
+    Stores the action plan compiled server-side from a recording session. It
+    only becomes the task's action plan when training completes without one.
+    """
+    cursor = db.execute(
+        "UPDATE tasks SET compiled_plan_json = ?, updated_at = ? WHERE id = ?", (compiled_plan_json, change_stamp(), task_id)
+    )
+    return cursor.rowcount > 0
+
+
+def compiled_plan_for_task(db: sqlite3.Connection, task_id: str) -> tuple | None:
+    """Returns `(compiled_plan_json,)` for the task, or None if it doesn't exist."""
+    return db.execute("SELECT compiled_plan_json FROM tasks WHERE id = ?", (task_id,)).fetchone()
+
+
+def replay_target(db: sqlite3.Connection, task_id: str) -> tuple | None:
+    """Returns `(user_id, title, notes, url, action_plan_json)` for the task, or None if it doesn't exist."""
+    return db.execute(
+        "SELECT user_id, title, notes, url, action_plan_json FROM tasks WHERE id = ?", (task_id,)
+    ).fetchone()
+
+
+def save_run_log(db: sqlite3.Connection, task_id: str, run_log_json: str) -> bool:
+    cursor = db.execute(
+        "UPDATE tasks SET last_run_log = ?, updated_at = ? WHERE id = ?", (run_log_json, change_stamp(), task_id)
+    )
+    return cursor.rowcount > 0
+
+
+def delete_task(db: sqlite3.Connection, task_id: str) -> str | None:
+    """
+    Deletes a task, leaving a tombstone for incremental sync. Returns the
+    owner's user id, or None if the task doesn't exist.
+    """
+    row = db.execute("SELECT user_id FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    if row is None:
+        return None
+    db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    db.execute(
+        "INSERT OR REPLACE INTO task_tombstones (id, user_id, deleted_at) VALUES (?, ?, ?)",
+        (task_id, row[0], change_stamp()),
+    )
+    return row[0]
+
+
+def set_recording_sampling(db: sqlite3.Connection, task_id: str, sampling_json: str | None) -> bool:
+    """Stores a task's recording sampling settings. Returns False if the task doesn't exist."""
+    cursor = db.execute(
+        "UPDATE tasks SET recording_sampling_json = ?, updated_at = ? WHERE id = ?", (sampling_json, change_stamp(), task_id)
+    )
+    return cursor.rowcount > 0
+
+
+def recording_sampling_for_task(db: sqlite3.Connection, task_id: str) -> str | None:
+    row = db.execute("SELECT recording_sampling_json FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    return row[0] if row else None
+
+
+# --- Reminders ---
+
+def due_reminders(db: sqlite3.Connection, now_iso: str) -> list[tuple]:
+    """
+    Returns `(task_id, user_id, title, push_token)` for every pending task that
+    is due and whose user has registered a push token, in a single query.
+    """
+    return db.execute(DUE_REMINDERS_SQL, (now_iso,)).fetchall()
+
+
+def mark_notified(db: sqlite3.Connection, task_ids: list[str]) -> int:
+    """Moves the given pending tasks to 'notified'. Returns the number updated."""
+    updated, stamp = 0, change_stamp()
+    for i in range(0, len(task_ids), MAX_IN_PARAMS):
+        chunk = task_ids[i:i + MAX_IN_PARAMS]
+        placeholders = ", ".join("?" for _ in chunk)
+        cursor = db.execute(
+            f"UPDATE tasks SET status = 'notified', updated_at = ? WHERE status = 'pending' AND id IN ({placeholders})",
+            (stamp, *chunk),
+        )
+        updated += cursor.rowcount
+    return updated
+
+
+# --- Push tokens ---
+
+def upsert_push_token(db: sqlite3.Connection, user_id: str, token: str):
+    db.execute("INSERT OR REPLACE INTO push_tokens (user_id, token) VALUES (?, ?)", (user_id, token))
@@ -0,0 +1,67 @@
+# in remo-backend/tests/bench_bulk_insert.py
+#
+# Compares task-import throughput for one POST /tasks per item (one write
+# transaction each) against POST /tasks/bulk (one executemany in a single
+# transaction), both through AsyncDatabase on a WAL database file.
+# Run from the backend directory:  python tests/bench_bulk_insert.py
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store
+from db import AsyncDatabase, migrate
+from ids import new_task_id
+
+ITEM_COUNTS = (100, 1_000, 5_000)
+
+
+def make_task(i: int) -> dict:
+    task = dict.fromkeys(store.TASK_COLUMNS)
+    task.update(
+        id=new_task_id(),
+        user_id="import_user",
+        title=f"Imported reminder {i}",
+        notes="Brought over from another app",
+        due_time="2030-01-01T09:00:00+00:00",
+        status="pending",
+        is_flagged=False,
+        is_training_required=False,
+        creation_date=datetime.now(timezone.utc).isoformat(),
+    )
+    return task
+
+
+async def one_per_request(database: AsyncDatabase, tasks: list[dict]):
+    for task in tasks:
+        await database.write(store.insert_task, task)
+
+
+async def bulk(database: AsyncDatabase, tasks: list[dict]):
+    failed = await database.write(store.insert_tasks, tasks)
+    assert not failed
+
+
+async def main():
+    print("--- Benchmarking task import throughput ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, insert_all in (("one per request", one_per_request), ("bulk", bulk)):
+            for count in ITEM_COUNTS:
+                database = AsyncDatabase(os.path.join(tmp, f"{label.replace(' ', '_')}_{count}.db"))
+                database.open()
+                await database.write(migrate, store.MIGRATIONS)
+                tasks = [make_task(i) for i in range(count)]
+                start = time.perf_counter()
+                await insert_all(database, tasks)
+                elapsed = time.perf_counter() - start
+                database.close()
+                print(f"{label:<16} {count:5d} tasks in {elapsed:7.3f}s | {count / elapsed:9.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
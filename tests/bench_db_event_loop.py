@@ -0,0 +1,98 @@
+# in remo-backend/tests/bench_db_event_loop.py
+#
+# Measures event-loop lag while many task inserts run concurrently, comparing
+# the old pattern (blocking sqlite3 calls on the loop) with AsyncDatabase.
+# Run from the backend directory:  python tests/bench_db_event_loop.py
+
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store
+from db import AsyncDatabase, migrate
+
+CONCURRENT_WRITES = 500
+TICK_SECONDS = 0.001
+
+
+def make_task(i: int) -> dict:
+    task = dict.fromkeys(store.TASK_COLUMNS)
+    task.update(
+        id=f"bench_{i}",
+        user_id=f"user_{i % 50}",
+        title=f"Benchmark task {i}",
+        status="pending",
+        is_flagged=False,
+        is_training_required=False,
+        creation_date=datetime.now(timezone.utc).isoformat(),
+    )
+    return task
+
+
+async def measure_lag(stop: asyncio.Event, samples: list[float]):
+    """Sleeps for one tick at a time and records how late each wake-up was."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def blocking_insert(db_name: str, task: dict):
+    # Mirrors the original handlers: connect, insert and commit on the loop.
+    db = sqlite3.connect(db_name)
+    store.insert_task(db, task)
+    db.commit()
+    db.close()
+
+
+async def run(label: str, write_all):
+    samples: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(0.05)  # let the ticker settle
+    start = time.perf_counter()
+    await write_all()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lag_ms = sorted(s * 1000 for s in samples)
+    p99 = lag_ms[min(len(lag_ms) - 1, int(len(lag_ms) * 0.99))]
+    print(
+        f"{label:<14} {CONCURRENT_WRITES} writes in {elapsed:6.3f}s | "
+        f"loop lag mean {statistics.mean(lag_ms):6.2f} ms, p99 {p99:6.2f} ms, max {lag_ms[-1]:6.2f} ms"
+    )
+
+
+async def main():
+    print("--- Benchmarking event-loop lag under concurrent DB writes ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        blocking_db = os.path.join(tmp, "blocking.db")
+        setup = sqlite3.connect(blocking_db)
+        migrate(setup, store.MIGRATIONS)
+        setup.close()
+
+        async def blocking_writes():
+            await asyncio.gather(*(blocking_insert(blocking_db, make_task(i)) for i in range(CONCURRENT_WRITES)))
+
+        await run("blocking", blocking_writes)
+
+        database = AsyncDatabase(os.path.join(tmp, "offloaded.db"))
+        database.open()
+        await database.write(migrate, store.MIGRATIONS)
+
+        async def offloaded_writes():
+            await asyncio.gather(*(database.write(store.insert_task, make_task(i)) for i in range(CONCURRENT_WRITES)))
+
+        await run("AsyncDatabase", offloaded_writes)
+        database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+# in remo-backend/tests/bench_recorder_startup.py
+#
+# Measures recorder start-up latency (new page -> first rrweb full snapshot)
+# for the old injection path (read rrweb.js from disk, page.evaluate after goto)
+# against the cached init script, and checks that recording survives a
+# navigation. Uses a locally served page so no network is needed.
+# Run from the backend directory:  python tests/bench_recorder_startup.py
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+from recorder import RECORD_BOOTSTRAP_JS, RRWEB_SCRIPT_CANDIDATES, load_recorder_script
+
+SESSIONS = 10
+FULL_SNAPSHOT = 2  # rrweb EventType.FullSnapshot
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = f"<!doctype html><title>{self.path}</title><h1>Page {self.path}</h1><a href='/next'>next</a>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def start_session(browser, url: str, cached: bool) -> tuple[float, asyncio.Queue, object]:
+    snapshots: asyncio.Queue = asyncio.Queue()
+    start = time.perf_counter()
+    page = await browser.new_page()
+
+    async def on_event(event):
+        if event.get("type") == FULL_SNAPSHOT:
+            snapshots.put_nowait(time.perf_counter())
+
+    await page.expose_function("send_event_to_backend", on_event)
+    if cached:
+        await page.add_init_script(load_recorder_script())
+        await page.goto(url)
+    else:
+        with open(next(p for p in RRWEB_SCRIPT_CANDIDATES if os.path.exists(p))) as f:
+            rrweb_source = f.read()
+        await page.goto(url)
+        await page.evaluate(rrweb_source)
+        await page.evaluate(RECORD_BOOTSTRAP_JS)
+    first_snapshot = await asyncio.wait_for(snapshots.get(), timeout=10)
+    return first_snapshot - start, snapshots, page
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/start"
+    load_recorder_script()  # done once at app startup
+    print(f"--- Benchmarking recorder start-up over {SESSIONS} sessions ---")
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        for label, cached in (("evaluate", False), ("init script", True)):
+            latencies, survived = [], 0
+            for _ in range(SESSIONS):
+                latency, snapshots, page = await start_session(browser, url, cached)
+                latencies.append(latency * 1000)
+                await page.click("a")
+                try:
+                    await asyncio.wait_for(snapshots.get(), timeout=2)
+                    survived += 1
+                except asyncio.TimeoutError:
+                    pass
+                await page.close()
+            print(
+                f"{label:<12} start-up mean {statistics.mean(latencies):6.1f} ms, "
+                f"median {statistics.median(latencies):6.1f} ms | recording survived navigation in {survived}/{SESSIONS}"
+            )
+        await browser.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
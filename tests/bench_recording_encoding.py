@@ -0,0 +1,74 @@
+# in remo-backend/tests/bench_recording_encoding.py
+#
+# Compares the recording wire encodings on a synthetic rrweb stream (one full
+# snapshot followed by mutations, mouse moves, scrolls and input): bytes on the
+# wire and encode CPU time per event, batched the same way as EventBatcher.
+# Run from the backend directory:  python tests/bench_recording_encoding.py
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recorder import WIRE_ENCODINGS, make_frame_encoder
+
+EVENTS = 20_000
+BATCH_SIZE = 50
+
+
+def synthetic_stream(count: int) -> list[dict]:
+    rng = random.Random(7)
+    nodes = [
+        {"type": 2, "tagName": "div", "attributes": {"class": f"card card-{i % 12} shadow"}, "childNodes": [
+            {"type": 3, "textContent": f"Item {i}: lorem ipsum dolor sit amet", "id": 2 * i + 2},
+        ], "id": 2 * i + 1}
+        for i in range(500)
+    ]
+    events = [{"type": 2, "data": {"node": {"type": 0, "childNodes": nodes, "id": 0}, "initialOffset": {"top": 0, "left": 0}}, "timestamp": 1_700_000_000_000}]
+    ts = events[0]["timestamp"]
+    for _ in range(count - 1):
+        ts += rng.randint(1, 30)
+        kind = rng.random()
+        if kind < 0.5:
+            data = {"source": 1, "positions": [{"x": rng.randint(0, 1280), "y": rng.randint(0, 800), "id": rng.randint(1, 1000), "timeOffset": -rng.randint(0, 50)} for _ in range(3)]}
+        elif kind < 0.7:
+            data = {"source": 3, "id": 1, "x": 0, "y": rng.randint(0, 5000)}
+        elif kind < 0.9:
+            node_id = rng.randint(1, 1000)
+            data = {"source": 0, "texts": [], "removes": [], "adds": [], "attributes": [{"id": node_id, "attributes": {"class": f"card card-{node_id % 12} shadow active"}}]}
+        else:
+            data = {"source": 5, "id": rng.randint(1, 1000), "text": "hello world"[: rng.randint(1, 11)], "isChecked": False}
+        events.append({"type": 3, "data": data, "timestamp": ts})
+    return events
+
+
+def main():
+    events = synthetic_stream(EVENTS)
+    batches = [events[i:i + BATCH_SIZE] for i in range(0, len(events), BATCH_SIZE)]
+    baseline = None
+    print(f"--- Benchmarking recording wire encodings: {EVENTS} events in batches of {BATCH_SIZE} ---")
+    for encoding in ("json (per-event frames)",) + WIRE_ENCODINGS:
+        if encoding.startswith("json (per-event"):
+            encode, frames_in = json.dumps, events  # the pre-batching wire format
+        else:
+            try:
+                encode, frames_in = make_frame_encoder(encoding), batches
+            except ValueError as e:
+                print(f"{encoding:<24} skipped: {e}")
+                continue
+        start = time.process_time()
+        frames = [encode(item) for item in frames_in]
+        cpu = time.process_time() - start
+        size = sum(len(f.encode("utf-8") if isinstance(f, str) else f) for f in frames)
+        baseline = baseline or size
+        print(
+            f"{encoding:<24} {size / 1024:9.1f} KiB ({size / baseline:6.1%} of per-event JSON) | "
+            f"{size / EVENTS:6.1f} B/event | {cpu / EVENTS * 1e6:6.2f} us CPU/event | {len(frames)} frames"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# in remo-backend/tests/bench_recording_memory.py
+#
+# Reports resident memory per concurrent recording session for the old model
+# (one Playwright driver + Chromium per session) and the shared model (one
+# browser, one BrowserContext per session). Memory is the summed RSS of this
+# process's child processes (Playwright drivers and Chromium), read from /proc,
+# so this runs on Linux only. Sessions record a locally served page headlessly.
+# Run from the backend directory:  python tests/bench_recording_memory.py
+
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+from browser import BlockPolicy, BrowserManager
+from recorder import load_recorder_script
+
+SESSION_COUNTS = (1, 4, 8)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        items = "".join(f"<li><a href='/item/{i}'>Item {i}</a> <button>Buy</button></li>" for i in range(200))
+        body = f"<!doctype html><title>Shop</title><h1>Shop</h1><ul>{items}</ul>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def descendant_rss_bytes() -> int:
+    """Summed RSS of every descendant of this process."""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return total
+
+
+async def prepare_page(page, url: str):
+    await page.expose_function("send_event_to_backend", lambda event: None)
+    await page.add_init_script(load_recorder_script())
+    await page.goto(url)
+
+
+async def per_session_browsers(count: int, url: str) -> int:
+    drivers, pages = [], []
+    for _ in range(count):
+        driver = await async_playwright().start()
+        browser = await driver.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await prepare_page(page, url)
+        drivers.append((driver, browser))
+        pages.append(page)
+    await asyncio.sleep(1)
+    rss = descendant_rss_bytes()
+    for driver, browser in drivers:
+        await browser.close()
+        await driver.stop()
+    return rss
+
+
+async def shared_browser(count: int, url: str) -> int:
+    manager = BrowserManager(headless=True, max_pages=count, block_policy=BlockPolicy())
+    await manager.start()
+    sessions = []
+    for i in range(count):
+        session = manager.page(f"bench-{i}")
+        page = await session.__aenter__()
+        await prepare_page(page, url)
+        sessions.append(session)
+    await asyncio.sleep(1)
+    rss = descendant_rss_bytes()
+    for session in sessions:
+        await session.__aexit__(None, None, None)
+    await manager.stop()
+    return rss
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    print("--- Benchmarking memory per concurrent recording session ---")
+    for count in SESSION_COUNTS:
+        before = await per_session_browsers(count, url)
+        after = await shared_browser(count, url)
+        print(
+            f"{count:2d} sessions | browser per session: {before / count / 2**20:7.1f} MiB/session "
+            f"| shared browser: {after / count / 2**20:7.1f} MiB/session ({after / before:6.1%} of before)"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
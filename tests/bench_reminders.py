@@ -0,0 +1,60 @@
+# in remo-backend/tests/bench_reminders.py
+#
+# Offline load test for the reminder pass: seeds a temporary database with due
+# tasks, then runs the same read -> send_reminders -> mark_notified pipeline
+# as main.check_reminders against FakeMessagingBackend.
+# Run from the backend directory:  python tests/bench_reminders.py
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store
+from db import AsyncDatabase, migrate
+from notifications import FakeMessagingBackend, send_reminders
+
+DUE_TASKS = 10_000
+USERS = 2_000
+
+
+def seed(db, count: int, users: int):
+    db.executemany(
+        "INSERT INTO push_tokens (user_id, token) VALUES (?, ?)",
+        [(f"user_{u}", f"token_{u}") for u in range(users)],
+    )
+    db.executemany(
+        "INSERT INTO tasks (id, user_id, title, due_time, status, creation_date) VALUES (?, ?, ?, ?, 'pending', ?)",
+        [(f"task_{i}", f"user_{i % users}", f"Reminder {i}", "2000-01-01T00:00:00+00:00", "2000-01-01T00:00:00+00:00") for i in range(count)],
+    )
+
+
+async def main():
+    print(f"--- Load testing the reminder pass with {DUE_TASKS} due tasks ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        database = AsyncDatabase(os.path.join(tmp, "reminders.db"))
+        database.open()
+        await database.write(migrate, store.MIGRATIONS)
+        await database.write(seed, DUE_TASKS, USERS)
+
+        backend = FakeMessagingBackend(latency=0.05, failure_rate=0.01, seed=1)
+        start = time.perf_counter()
+        due = await database.read(store.due_reminders, "2030-01-01T00:00:00+00:00")
+        read_done = time.perf_counter()
+        delivered = await send_reminders(due, backend)
+        send_done = time.perf_counter()
+        updated = await database.write(store.mark_notified, delivered)
+        end = time.perf_counter()
+        database.close()
+
+    print(f"Read {len(due)} due reminders in {(read_done - start) * 1000:.1f} ms")
+    print(f"Sent {backend.messages_sent} messages in {backend.batches_sent} batches in {(send_done - read_done) * 1000:.1f} ms")
+    print(f"Marked {updated} tasks notified in {(end - send_done) * 1000:.1f} ms ({len(due) - len(delivered)} failed, left pending)")
+    print(f"Total: {(end - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# in remo-backend/tests/bench_resource_blocking.py
+#
+# Compares agent page loads under each BROWSER_LOAD_MODE preset against a set
+# of locally served fixture pages. The fixtures are generated on the fly: each
+# page carries images, a web font, a video, a "tracker" script and an "ad"
+# iframe. Trackers and ads are served from http://localhost while pages are
+# served from http://127.0.0.1, so the benchmark can block them by domain
+# without touching the network.
+# Run from the backend directory:  python tests/bench_resource_blocking.py
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser import BlockPolicy, BrowserManager
+
+PAGES = 10
+IMAGES_PER_PAGE = 12
+IMAGE_BYTES = 150_000
+AD_BYTES = 300_000
+FONT_BYTES = 80_000
+VIDEO_BYTES = 1_000_000
+ROUNDS = 3
+
+bytes_served = 0
+bytes_lock = threading.Lock()
+
+
+def fixture_page(n: int, port: int) -> str:
+    images = "\n".join(f'<img src="/img/{n}_{i}.png" width="200" height="120">' for i in range(IMAGES_PER_PAGE))
+    return f"""<!doctype html>
+<html><head>
+  <title>Fixture page {n}</title>
+  <link rel="stylesheet" href="/style.css">
+  <script src="http://localhost:{port}/tracker.js?page={n}"></script>
+</head><body>
+  <h1>Fixture page {n}</h1>
+  <p>Some article text for page {n}.</p>
+  <a href="/page/{(n + 1) % PAGES}.html">Next page</a>
+  <button>Subscribe</button>
+  {images}
+  <video src="/video/{n}.mp4" autoplay muted></video>
+  <iframe src="http://localhost:{port}/ad.html?page={n}" width="300" height="250"></iframe>
+</body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        global bytes_served
+        path = self.path.split("?")[0]
+        port = self.server.server_address[1]
+        if path.startswith("/page/"):
+            body, ctype = fixture_page(int(path[6:].split(".")[0]), port).encode(), "text/html"
+        elif path == "/style.css":
+            body = b"@font-face { font-family: Fixture; src: url(/font.woff2); } body { font-family: Fixture; }"
+            ctype = "text/css"
+        elif path == "/font.woff2":
+            body, ctype = b"\0" * FONT_BYTES, "font/woff2"
+        elif path.startswith("/img/"):
+            body, ctype = b"\0" * IMAGE_BYTES, "image/png"
+        elif path.startswith("/video/"):
+            body, ctype = b"\0" * VIDEO_BYTES, "video/mp4"
+        elif path == "/ad.html":
+            body, ctype = f'<!doctype html><img src="http://localhost:{port}/ad.png">'.encode(), "text/html"
+        elif path == "/ad.png":
+            body, ctype = b"\0" * AD_BYTES, "image/png"
+        elif path == "/tracker.js":
+            time.sleep(0.05)  # third-party scripts are slow and render-blocking
+            body, ctype = b"window.__tracked = true;", "application/javascript"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        with bytes_lock:
+            bytes_served += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def bench_mode(label: str, policy: BlockPolicy, port: int):
+    global bytes_served
+    manager = BrowserManager(block_policy=policy)
+    await manager.start()
+    with bytes_lock:
+        bytes_served = 0
+    start = time.perf_counter()
+    for round_no in range(ROUNDS):
+        session_id = f"bench-{label}-{round_no}"
+        for n in range(PAGES):
+            async with manager.page(session_id) as page:
+                await page.goto(f"http://127.0.0.1:{port}/page/{n}.html", wait_until="load")
+        await manager.release(session_id)
+    elapsed = time.perf_counter() - start
+    await manager.stop()
+    loads = ROUNDS * PAGES
+    print(
+        f"{label:<12} {elapsed / loads * 1000:7.1f} ms/page | {bytes_served / loads / 1024:8.1f} KiB/page | "
+        f"blocked {policy.blocked_requests} of {policy.blocked_requests + policy.allowed_requests} requests"
+    )
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"--- Benchmarking load modes over {PAGES} fixture pages x {ROUNDS} rounds ---")
+    try:
+        for mode in ("full", "fast", "text"):
+            policy = BlockPolicy.for_mode(mode)
+            if mode != "full":
+                policy.domains.append("localhost")  # stands in for third-party trackers
+            await bench_mode(mode, policy, port)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
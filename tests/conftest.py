@@ -0,0 +1,10 @@
+# in remo-backend/tests/conftest.py
+#
+# The backend is a flat set of top-level modules (store, db, ...), not a
+# package, so put the backend directory on sys.path for the tests, however
+# pytest is started (`pytest`, `python -m pytest`, or from inside tests/).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+# in remo-backend/tests/test_bulk_tasks.py
+
+import sqlite3
+
+import store
+from db import migrate
+
+
+def make_task(task_id: str, **fields) -> dict:
+    return {**dict.fromkeys(store.TASK_COLUMNS), "id": task_id, "user_id": "u", "title": task_id,
+            "status": "pending", "creation_date": "2030-01-01", **fields}
+
+
+def make_db() -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    migrate(db, store.MIGRATIONS)
+    store.insert_task(db, make_task("task_existing"))
+    return db
+
+
+def test_bulk_insert_reports_failed_rows_and_keeps_the_rest():
+    db = make_db()
+    failed = store.insert_tasks(db, [make_task("task_a"), make_task("task_existing"), make_task("task_b")])
+    assert list(failed) == [1] and "UNIQUE" in failed[1]
+    ids = [row[0] for row in db.execute("SELECT id FROM tasks ORDER BY id")]
+    assert ids == ["task_a", "task_b", "task_existing"]
+
+
+def test_bulk_update_groups_by_columns_and_reports_missing_tasks():
+    db = make_db()
+    store.insert_tasks(db, [make_task("task_a"), make_task("task_b")])
+    failed = store.update_tasks(db, [
+        {"id": "task_a", "status": "notified"},
+        {"id": "task_missing", "status": "notified"},
+        {"id": "task_b", "title": "Renamed", "is_flagged": True},
+    ])
+    assert failed == {1: "Task not found"}
+    rows = db.execute("SELECT id, title, status, is_flagged FROM tasks WHERE id IN ('task_a', 'task_b') ORDER BY id")
+    assert rows.fetchall() == [("task_a", "task_a", "notified", None), ("task_b", "Renamed", "pending", 1)]
+
+
+def test_bulk_update_applies_repeated_ids_in_request_order():
+    db = make_db()
+    store.update_tasks(db, [
+        {"id": "task_existing", "title": "X"},
+        {"id": "task_existing", "title": "Y", "notes": "N"},
+        {"id": "task_existing", "title": "Z"},
+    ])
+    assert db.execute("SELECT title, notes FROM tasks WHERE id = 'task_existing'").fetchone() == ("Z", "N")
@@ -0,0 +1,55 @@
+# in remo-backend/tests/test_change_hub.py
+
+import asyncio
+
+import store
+from changes import ChangeHub
+from db import AsyncDatabase, migrate
+
+
+def test_events_reach_only_the_owners_subscribers():
+    async def main():
+        hub = ChangeHub()
+        with hub.subscribe("alice") as alice, hub.subscribe("bob") as bob:
+            hub.publish("alice", {"type": "task", "n": 1})
+            assert await alice.get() == {"type": "task", "n": 1}
+            assert bob.empty()
+        assert not hub.has_subscribers()
+        hub.publish("alice", {"type": "task", "n": 2})  # nobody listening; dropped silently
+        return hub.stats()
+
+    stats = asyncio.run(main())
+    assert stats["published"] == 2 and stats["delivered"] == 1
+
+
+def test_slow_subscriber_is_told_to_resync():
+    async def main():
+        hub = ChangeHub(queue_size=3)
+        with hub.subscribe("alice") as queue:
+            for n in range(5):
+                hub.publish("alice", {"type": "task", "n": n})
+            events = [queue.get_nowait() for _ in range(queue.qsize())]
+        return events, hub.stats()
+
+    events, stats = asyncio.run(main())
+    assert events == [{"type": "resync"}, {"type": "task", "n": 4}]
+    assert stats["resyncs"] == 1
+
+
+def test_commit_callbacks_run_in_commit_order(tmp_path):
+    async def main():
+        database = AsyncDatabase(str(tmp_path / "remo.db"), pool_size=2)
+        database.open()
+        await database.write(migrate, store.MIGRATIONS)
+        published = []
+
+        def touch(db, n):
+            return n, store.change_stamp()
+
+        await asyncio.gather(*(database.write(touch, n, on_commit=published.append) for n in range(50)))
+        database.close()
+        return published
+
+    published = asyncio.run(main())
+    stamps = [stamp for _, stamp in published]
+    assert stamps == sorted(stamps) and len(published) == 50
@@ -0,0 +1,95 @@
+# in remo-backend/tests/test_event_batcher.py
+
+import asyncio
+import json
+
+from recorder import EventBatcher
+
+
+def run_batcher(events: list, window_ms: int, max_events: int) -> list[list]:
+    frames = []
+
+    async def send(batch):
+        frames.append(batch)
+        return len(json.dumps(batch))
+
+    async def main():
+        batcher = EventBatcher(send, window_ms=window_ms, max_events=max_events)
+        task = asyncio.create_task(batcher.run())
+        for event in events:
+            batcher.add(event)
+        await asyncio.sleep(0.05)
+        batcher.close()
+        await task
+        return batcher.stats()
+
+    return frames, asyncio.run(main())
+
+
+def test_events_within_window_share_a_frame():
+    frames, stats = run_batcher([{"type": 3, "n": i} for i in range(10)], window_ms=20, max_events=100)
+    assert frames == [[{"type": 3, "n": i} for i in range(10)]]
+    assert stats["events"] == 10 and stats["frames"] == 1
+
+
+def test_max_events_splits_frames():
+    frames, stats = run_batcher(list(range(25)), window_ms=1000, max_events=10)
+    assert [len(f) for f in frames] == [10, 10, 5]
+    assert sum(frames, []) == list(range(25))
+    assert stats["bytes"] > 0
+
+
+def test_overflow_coalesces_and_drops_only_low_value_events():
+    mousemove = lambda i: {"type": 3, "data": {"source": 1, "positions": [{"x": i}]}}
+    scroll = lambda i: {"type": 3, "data": {"source": 3, "id": 7, "y": i}}
+    full_snapshot = {"type": 2, "data": {}}
+    input_event = {"type": 3, "data": {"source": 5, "id": 9, "text": "hi"}}
+
+    async def main():
+        batcher = EventBatcher(None, max_events=1, max_buffered=10)
+        batcher.add(full_snapshot)
+        for i in range(50):
+            batcher.add(mousemove(i))
+            batcher.add(scroll(i))
+        batcher.add(input_event)
+        return batcher
+
+    batcher = asyncio.run(main())
+    buffered = batcher._buffer
+    assert len(buffered) <= 10
+    assert buffered[0] == full_snapshot and buffered[-1] == input_event
+    assert batcher.coalesced > 0
+    assert batcher.coalesced + batcher.dropped + len(buffered) == 102
+
+
+def test_critical_events_are_never_dropped():
+    async def main():
+        batcher = EventBatcher(None, max_events=1, max_buffered=10)
+        for i in range(15):
+            batcher.add({"type": 3, "data": {"source": 0, "adds": [i]}})
+        return batcher
+
+    batcher = asyncio.run(main())
+    assert len(batcher._buffer) == 15 and batcher.dropped == 0
+
+
+def test_full_buffer_without_droppable_events_skips_shedding():
+    async def main():
+        batcher = EventBatcher(None, max_events=1, max_buffered=100)
+        sheds = []
+        shed = batcher._shed
+        batcher._shed = lambda: (sheds.append(1), shed())
+        for i in range(150):
+            batcher.add({"type": 3, "data": {"source": 0, "adds": [i]}})
+        for i in range(20):
+            batcher.add({"type": 3, "data": {"source": 1, "positions": [{"x": i}]}})
+        return batcher, sheds
+
+    batcher, sheds = asyncio.run(main())
+    assert sheds == [] and batcher.dropped == 20 and len(batcher._buffer) == 150
+
+
+def test_client_batch_settings_cannot_raise_the_buffer_cap():
+    batcher = EventBatcher(None, window_ms=3_600_000, max_events=10**9, max_buffered=5000)
+    assert batcher.max_buffered == 5000 and batcher.max_events == 5000
+    assert batcher.window == 1.0
@@ -0,0 +1,23 @@
+# in remo-backend/tests/test_ids.py
+
+from datetime import datetime, timedelta, timezone
+
+from ids import new_task_id, task_id_floor, ulid_time
+
+
+def test_task_ids_sort_by_creation_time_and_do_not_collide():
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    ids = [new_task_id(start + timedelta(milliseconds=i // 100)) for i in range(10_000)]
+    assert len(set(ids)) == len(ids)
+    assert [ulid_time(i[5:]) for i in sorted(ids)] == sorted(ulid_time(i[5:]) for i in ids)
+    assert all(len(i) == 31 and i.startswith("task_") for i in ids)
+
+
+def test_id_floor_splits_ids_at_a_timestamp():
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    cut = start + timedelta(seconds=5)
+    earlier = [new_task_id(start + timedelta(seconds=s)) for s in range(5)]
+    later = [new_task_id(start + timedelta(seconds=s)) for s in range(5, 10)]
+    floor = task_id_floor(cut)
+    assert all(i < floor for i in earlier) and all(i >= floor for i in later)
+    assert ulid_time(floor[5:]) == cut
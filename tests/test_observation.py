@@ -0,0 +1,32 @@
+# in remo-backend/tests/test_observation.py
+
+from observation import render_observation
+
+
+def make_raw(elements: int, blocks: int) -> dict:
+    return {
+        "url": "https://example.com/",
+        "title": "Example",
+        "elements": [
+            {"id": f"e{i}", "tag": "a", "role": "", "type": "", "name": f"Link {i}", "href": f"/page/{i}"}
+            for i in range(1, elements + 1)
+        ],
+        "text": [{"tag": "h1", "text": "Welcome"}] + [{"tag": "p", "text": f"Paragraph number {i}."} for i in range(blocks)],
+    }
+
+
+def test_renders_elements_with_ids_and_text():
+    obs = render_observation(make_raw(elements=2, blocks=1))
+    assert "Page: Example" in obs
+    assert '[e1] a "Link 1" -> /page/1' in obs
+    assert "# Welcome" in obs
+    assert "Paragraph number 0." in obs
+
+
+def test_respects_budget_and_reports_omissions():
+    obs = render_observation(make_raw(elements=1000, blocks=1000), budget=2000)
+    assert len(obs) <= 2000
+    assert "more elements omitted" in obs
+    assert "more text blocks omitted" in obs
+    # Text still gets a share of the budget when there are many elements.
+    assert "# Welcome" in obs
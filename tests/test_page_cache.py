@@ -0,0 +1,68 @@
+# in remo-backend/tests/test_page_cache.py
+
+from page_cache import PageCache, normalize_url
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443?b=2&utm_source=x&a=1#top") == "https://example.com/?a=1&b=2"
+    assert normalize_url("http://example.com:8080/path") == "http://example.com:8080/path"
+
+
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    cache = PageCache(default_ttl=60, clock=clock)
+    cache.store("https://example.com/", "obs", {})
+    assert cache.lookup("https://example.com/#frag") == ("obs", None)
+    clock.now = 61
+    assert cache.lookup("https://example.com/") == (None, None)
+    assert cache.counters["hits"] == 1 and cache.counters["misses"] == 1
+
+
+def test_cache_control_and_etag_revalidation():
+    clock = FakeClock()
+    cache = PageCache(clock=clock)
+    cache.store("https://a.test/", "secret", {"cache-control": "private, max-age=600"})
+    assert cache.lookup("https://a.test/") == (None, None)
+    cache.store("https://a.test/", "session", {"cache-control": "max-age=600", "set-cookie": "sid=1"})
+    assert cache.lookup("https://a.test/") == (None, None)
+
+    cache.store("https://b.test/", "obs", {"cache-control": "max-age=10", "etag": '"v1"'})
+    clock.now = 11
+    assert cache.lookup("https://b.test/") == (None, '"v1"')
+    assert cache.revalidated("https://b.test/", {"cache-control": "max-age=10"}) == "obs"
+    assert cache.lookup("https://b.test/") == ("obs", None)
+
+
+def test_lru_eviction_respects_memory_bound():
+    cache = PageCache(max_bytes=10)
+    cache.store("https://a.test/", "aaaa", {})
+    cache.store("https://b.test/", "bbbb", {})
+    cache.lookup("https://a.test/")  # a is now most recently used
+    cache.store("https://c.test/", "cccc", {})
+    assert cache.lookup("https://b.test/") == (None, None)
+    assert cache.lookup("https://a.test/") == ("aaaa", None)
+    assert cache.stats()["bytes"] <= 10
+
+
+def test_scoped_entries_are_private_to_their_session():
+    cache = PageCache()
+    headers = {"cache-control": "private, max-age=600", "set-cookie": "sid=1"}
+    cache.store("https://a.test/", "alice's inbox", headers, scope="session-a")
+    assert cache.lookup("https://a.test/") == (None, None)
+    assert cache.lookup("https://a.test/", "session-b") == (None, None)
+    assert cache.lookup("https://a.test/", "session-a") == ("alice's inbox", None)
+    assert cache.counters["scoped_hits"] == 1
+
+    cache.store("https://a.test/", "public", {})
+    cache.drop_scope("session-a")
+    assert cache.lookup("https://a.test/", "session-a") == (None, None)
+    assert cache.lookup("https://a.test/") == ("public", None)
+    assert cache.stats()["entries"] == 1
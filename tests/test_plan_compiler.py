@@ -0,0 +1,74 @@
+# in remo-backend/tests/test_plan_compiler.py
+
+from plan_compiler import ActionPlanCompiler
+
+
+def element(node_id, tag, attrs=None, children=()):
+    return {"type": 2, "id": node_id, "tagName": tag, "attributes": attrs or {}, "childNodes": list(children)}
+
+
+def text(node_id, value):
+    return {"type": 3, "id": node_id, "textContent": value}
+
+
+SNAPSHOT = {"type": 0, "id": 1, "childNodes": [element(2, "html", children=[element(3, "body", children=[
+    element(4, "form", {"id": "login"}, [
+        element(5, "input", {"name": "email", "type": "email"}),
+        element(6, "input", {"id": "pw-48213", "type": "password"}),
+        element(7, "button", {}, [text(8, "Sign in")]),
+    ]),
+])])]}
+
+
+def compile_events(events):
+    compiler = ActionPlanCompiler()
+    for event in events:
+        compiler.add(event)
+    return compiler.plan()
+
+
+def test_compiles_navigate_type_and_click():
+    plan = compile_events([
+        {"type": 4, "data": {"href": "https://example.com/login"}, "timestamp": 1},
+        {"type": 2, "data": {"node": SNAPSHOT}, "timestamp": 2},
+        {"type": 3, "data": {"source": 2, "type": 2, "id": 5}, "timestamp": 3},
+        {"type": 3, "data": {"source": 5, "id": 5, "text": "a"}, "timestamp": 4},
+        {"type": 3, "data": {"source": 5, "id": 5, "text": "a@b.co"}, "timestamp": 5},
+        {"type": 3, "data": {"source": 2, "type": 2, "id": 8}, "timestamp": 6},
+    ])
+    assert [step["action"] for step in plan] == ["navigate", "type", "click"]
+    assert plan[0]["url"] == "https://example.com/login"
+    assert plan[1]["value"] == "a@b.co"
+    assert plan[1]["selectors"][0] == 'input[name="email"]'
+    assert plan[2]["selectors"][0] == 'button:has-text("Sign in")'
+    assert plan[2]["selectors"][-1] == "#login > button"
+
+
+def test_generated_ids_are_not_used_and_mutations_are_tracked():
+    plan = compile_events([
+        {"type": 2, "data": {"node": SNAPSHOT}},
+        {"type": 3, "data": {"source": 0, "adds": [
+            {"parentId": 4, "nextId": None, "node": element(9, "a", {"href": "/forgot"}, [text(10, "Forgot?")])},
+        ], "removes": [{"parentId": 4, "id": 7}], "attributes": [], "texts": []}},
+        {"type": 3, "data": {"source": 5, "id": 6, "text": "*****"}},
+        {"type": 3, "data": {"source": 2, "type": 2, "id": 9}},
+    ])
+    assert all("pw-48213" not in s for s in plan[0]["selectors"])
+    assert plan[0]["selectors"][-1] == "#login > input:nth-of-type(2)"
+    assert plan[0]["secret"] is True and "value" not in plan[0]
+    assert plan[1]["selectors"][:2] == ['a:has-text("Forgot?")', 'a[href="/forgot"]']
+
+
+def test_selectors_escape_ids_and_keep_non_ascii_text():
+    snapshot = {"type": 0, "id": 1, "childNodes": [element(2, "html", children=[element(3, "body", children=[
+        element(4, "button", {"id": "a.b", "aria-label": 'Café "Noir"'}, [text(5, "Envoyé")]),
+    ])])]}
+    plan = compile_events([
+        {"type": 2, "data": {"node": snapshot}},
+        {"type": 3, "data": {"source": 2, "type": 2, "id": 4}},
+    ])
+    assert plan[0]["selectors"] == [
+        '[id="a.b"]',
+        'button[aria-label="Café \\"Noir\\""]',
+        'button:has-text("Envoyé")',
+    ]
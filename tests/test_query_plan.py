@@ -0,0 +1,106 @@
+# in remo-backend/tests/test_query_plan.py
+
+import sqlite3
+
+import store
+from db import migrate
+
+
+def make_db() -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    migrate(db, store.MIGRATIONS)
+    return db
+
+
+def query_plan(db: sqlite3.Connection, sql: str, params: tuple) -> str:
+    rows = db.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_migrations_are_recorded_and_idempotent():
+    db = make_db()
+    latest = store.MIGRATIONS[-1][0]
+    assert db.execute("PRAGMA user_version").fetchone()[0] == latest
+    assert migrate(db, store.MIGRATIONS) == latest
+
+
+def test_migrations_convert_a_legacy_tasks_table():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE tasks (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, title TEXT NOT NULL, goal TEXT, "
+               "due_time TEXT, status TEXT NOT NULL, is_training_required BOOLEAN)")
+    db.execute("INSERT INTO tasks VALUES ('task_1', 'u', 'Pay rent', 'on the landlord site', NULL, 'pending', 0)")
+    db.commit()
+    assert migrate(db, store.MIGRATIONS) == store.MIGRATIONS[-1][0]
+    task = store.get_task(db, "task_1")
+    assert task["notes"] == "on the landlord site" and task["creation_date"] and task["updated_at"]
+
+
+def test_reminder_scan_uses_pending_index():
+    plan = query_plan(make_db(), store.DUE_REMINDERS_SQL, ("2030-01-01T00:00:00+00:00",))
+    assert "idx_tasks_pending_due" in plan
+    assert "SCAN" not in plan
+
+
+def test_user_listing_pages_off_the_cursor_index():
+    columns = ", ".join(store.LIST_TASK_COLUMNS)
+    for sql, params in (
+        (store.LIST_TASKS_SQL, ("user_1", 50)),
+        (store.LIST_TASKS_AFTER_SQL, ("user_1", "2030-01-01T00:00:00+00:00", "task_1", 50)),
+    ):
+        plan = query_plan(make_db(), sql.format(columns=columns), params)
+        assert "idx_tasks_user_created_id" in plan
+        assert "SCAN" not in plan and "TEMP B-TREE" not in plan
+
+
+def test_keyset_pages_cover_every_task_once():
+    db = make_db()
+    db.executemany(
+        "INSERT INTO tasks (id, user_id, title, status, creation_date, is_flagged, action_plan_json) "
+        "VALUES (?, 'u', 't', 'pending', ?, 0, '[]')",
+        [(f"task_{i:03d}", f"2030-01-0{i % 3 + 1}") for i in range(25)],
+    )
+    seen, after = [], None
+    while True:
+        page = store.list_tasks(db, "u", limit=10, after=after)
+        seen += [task["id"] for task in page]
+        if len(page) < 10:
+            break
+        after = (page[-1]["creation_date"], page[-1]["id"])
+    assert sorted(seen) == sorted(f"task_{i:03d}" for i in range(25)) and len(seen) == 25
+    assert "action_plan_json" not in page[0] and page[0]["is_flagged"] is False
+
+
+def test_sync_queries_use_change_indexes():
+    after = ("user_1", "2030-01-01T00:00:00.000000+00:00", "task_1", 500)
+    plan = query_plan(make_db(), store.CHANGED_TASKS_SQL.format(columns=", ".join(store.LIST_TASK_COLUMNS)), after)
+    assert "idx_tasks_user_updated" in plan
+    assert "SCAN" not in plan and "TEMP B-TREE" not in plan
+    plan = query_plan(make_db(), store.DELETED_TASKS_SQL, after)
+    assert "idx_tombstones_user_deleted" in plan
+    assert "SCAN" not in plan and "TEMP B-TREE" not in plan
+
+
+def test_task_changes_return_updates_and_tombstones_after_cursor():
+    db = make_db()
+    for i in range(3):
+        store.insert_task(db, {col: None for col in store.TASK_COLUMNS} | {
+            "id": f"task_{i}", "user_id": "u", "title": "t", "status": "pending", "creation_date": "2030-01-01",
+        })
+    _, _, cursor, _ = store.task_changes(db, "u", ("", ""))
+    store.mark_notified(db, ["task_1"])
+    store.delete_task(db, "task_2")
+    tasks, deleted, last_key, has_more = store.task_changes(db, "u", cursor)
+    assert [(t["id"], t["status"]) for t in tasks] == [("task_1", "notified")]
+    assert deleted == ["task_2"] and last_key > cursor and not has_more
+    assert store.task_changes(db, "u", last_key)[:3] == ([], [], None)
+
+
+def test_mark_notified_updates_in_batches():
+    db = make_db()
+    ids = [f"task_{i}" for i in range(store.MAX_IN_PARAMS * 2 + 5)]
+    db.executemany(
+        "INSERT INTO tasks (id, user_id, title, status, creation_date) VALUES (?, 'u', 't', 'pending', '')",
+        [(task_id,) for task_id in ids],
+    )
+    assert store.mark_notified(db, ids) == len(ids)
+    assert db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'notified'").fetchone()[0] == len(ids)
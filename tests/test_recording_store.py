@@ -0,0 +1,42 @@
+# in remo-backend/tests/test_recording_store.py
+
+import asyncio
+import os
+
+import pytest
+
+from recording_store import RecordingWriter, list_recordings, read_events
+
+
+def write_recording(root, events: list, **kwargs) -> RecordingWriter:
+    async def main():
+        async with RecordingWriter("task_1", root=str(root), flush_interval=0.01, **kwargs) as writer:
+            for event in events:
+                writer.add(event)
+                await asyncio.sleep(0)
+        return writer
+
+    return asyncio.run(main())
+
+
+def test_round_trip_with_segment_rotation(tmp_path):
+    events = [{"type": 3, "n": i} for i in range(300)]
+    writer = write_recording(tmp_path, events, flush_max_events=10, segment_max_bytes=200)
+    [recording] = list_recordings("task_1", root=str(tmp_path))
+    assert recording["recording_id"] == writer.recording_id
+    assert recording["complete"] and recording["segments"] > 1
+    assert list(read_events("task_1", writer.recording_id, root=str(tmp_path))) == events
+
+
+def test_torn_final_write_is_skipped(tmp_path):
+    events = [{"type": 3, "n": i} for i in range(50)]
+    writer = write_recording(tmp_path, events)
+    segment = os.path.join(writer.path, "000001.jsonl.gz")
+    with open(segment, "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00partial")
+    assert list(read_events("task_1", writer.recording_id, root=str(tmp_path))) == events
+
+
+def test_rejects_path_traversal(tmp_path):
+    with pytest.raises(ValueError):
+        list(read_events("../etc", "x", root=str(tmp_path)))
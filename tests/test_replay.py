@@ -0,0 +1,85 @@
+# in remo-backend/tests/test_replay.py
+
+import asyncio
+
+import pytest
+
+from replay import replay_action_plan
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page, self.selector = page, selector
+        self.first = self
+
+    async def count(self):
+        return 1 if self.selector in self.page.present else 0
+
+    async def click(self, timeout):
+        self.page.actions.append(("click", self.selector))
+        self.page.url = self.page.click_targets.get(self.selector, self.page.url)
+
+    async def fill(self, value, timeout):
+        self.page.actions.append(("fill", self.selector, value))
+
+
+class FakePage:
+    def __init__(self, present, click_targets=None):
+        self.present = set(present)
+        self.click_targets = click_targets or {}
+        self.actions = []
+        self.url = "about:blank"
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    async def goto(self, url, wait_until, timeout):
+        self.actions.append(("goto", url))
+        self.url = url
+
+    async def wait_for_url(self, url, timeout):
+        if self.url != url:
+            raise TimeoutError(url)
+
+
+PLAN = [
+    {"action": "navigate", "url": "https://shop.test/", "implicit": False},
+    {"action": "type", "value": "milk", "selectors": ["#search", "input[name=\"q\"]"]},
+    {"action": "click", "selectors": ["#go", "button:has-text(\"Search\")"], "text": "Search"},
+    {"action": "navigate", "url": "https://shop.test/results", "implicit": True},
+]
+
+
+def test_replay_uses_fallback_selectors_and_waits_for_implicit_navigation():
+    page = FakePage({"input[name=\"q\"]", "#go"}, {"#go": "https://shop.test/results"})
+    result = asyncio.run(replay_action_plan(page, PLAN, step_timeout_ms=50))
+    assert result["status"] == "success" and result["steps_completed"] == 4
+    assert page.actions == [
+        ("goto", "https://shop.test/"),
+        ("fill", "input[name=\"q\"]", "milk"),
+        ("click", "#go"),
+    ]
+
+
+def test_replay_stops_at_first_failing_step():
+    page = FakePage({"#search"})
+    result = asyncio.run(replay_action_plan(page, PLAN, step_timeout_ms=50))
+    assert result["status"] == "failed"
+    assert result["failed_step"] == 2 and result["steps_completed"] == 2
+    assert result["log"][-1]["status"] == "failed"
+
+
+def test_masked_input_hands_over_instead_of_typing():
+    page = FakePage({"#password"})
+    plan = [{"action": "type", "secret": True, "selectors": ["#password"]}]
+    result = asyncio.run(replay_action_plan(page, plan, step_timeout_ms=50))
+    assert result["status"] == "failed" and "masked" in result["error"]
+    assert page.actions == []
+
+
+def test_malformed_plans_are_rejected_before_running():
+    page = FakePage(set())
+    for plan in (["click login"], [{"action": "hover"}], {"action": "click"}):
+        with pytest.raises(ValueError):
+            asyncio.run(replay_action_plan(page, plan, step_timeout_ms=50))
+    assert page.actions == []
@@ -1,10 +1,19 @@
 # in remo-backend/tools.py
 
-from playwright.async_api import async_playwright
 # Import ToolContext to access agent actions
 from google.adk.tools import ToolContext
+import asyncio
 import json
+import time
+import uuid
 from fastapi import WebSocket
+from browser import BrowserBusyError, browser_manager, recording_browsers
+from observation import extract_observation
+from page_cache import page_cache
+from recorder import (
+    BATCH_MAX_EVENTS, BATCH_WINDOW_MS, RECORDER_IDLE_TIMEOUT, EventBatcher, Screencast, forward_client_input, load_recorder_script,
+    make_frame_encoder, record_options_script, recording_metrics,
+)
 
 # This tool will let our agent exit the loop.
 def finish_task(reason: str, tool_context: ToolContext):
@@ -21,69 +30,197 @@ def finish_task(reason: str, tool_context: ToolContext):
     return {"status": "finished", "reason": reason}
 
 
-async def use_browser_and_get_content(url: str) -> dict:
+async def use_browser_and_get_content(url: str, tool_context: ToolContext) -> dict:
     """
-    Navigates to a URL and returns a simplified version of the page's HTML content
-    for an LLM to analyze.
+    Navigates to a URL and returns a compact observation of the page for an LLM
+    to analyze: its title, the visible interactive elements (each with a stable
+    id like [e12]) and the visible text, trimmed to a fixed size budget.
     """
     print(f"--- Browser Tool Activated (Async): Navigating to {url} ---")
+    # Each agent session browses in its own context on the shared browser.
+    session_id = tool_context._invocation_context.session.id
+    # Requests can set page_cache_bypass (seeded into session state) to always load live pages.
+    use_cache = not tool_context.state.get("page_cache_bypass", False)
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            await page.goto(url, wait_until='domcontentloaded')
-            
-            print(f"--- Browser Tool: Successfully navigated to {url} ---")
-            
-            # Get the full HTML content of the page
-            page_content = await page.content()
-            
-            await browser.close()
-            
-            # We will simplify this later. For now, just return it.
-            return {"status": "success", "html_content": page_content}
+        context = await browser_manager.context_for(session_id)
+        page_observation = None
+        if use_cache:
+            page_observation = await _cached_observation(url, context, await _cache_scope(url, context, session_id))
+        if page_observation is not None:
+            print(f"--- Browser Tool: Served {url} from the page cache ---")
+        else:
+            if not use_cache:
+                page_cache.counters["bypassed"] += 1
+            async with browser_manager.page(session_id) as page:
+                response = await page.goto(url, wait_until='domcontentloaded')
+
+                print(f"--- Browser Tool: Successfully navigated to {url} ---")
+
+                page_observation = await extract_observation(page)
+            if use_cache and response is not None and response.status == 200:
+                page_cache.store(url, page_observation, await response.all_headers(),
+                                 scope=await _cache_scope(url, context, session_id))
+
+        # The planner reads the latest observation from session state.
+        tool_context.state["page_observation"] = page_observation
+        return {"status": "success", "url": url, "observation": page_observation}
     except Exception as e:
         print(f"--- Browser Tool: A critical error occurred: {e} ---")
         return {"status": "error", "message": str(e)}
 
 
+async def _cache_scope(url: str, context, session_id: str) -> str | None:
+    """
+    The page cache is shared by every session, but a page loaded with cookies
+    (e.g. after replay logged in) may be personal, so a context holding
+    cookies for the URL gets a cache scope of its own.
+    """
+    return session_id if await context.cookies(url) else None
+
 
-async def start_interactive_session(url: str, websocket: WebSocket):
+async def _cached_observation(url: str, context, scope: str | None) -> str | None:
+    """Returns a cached observation for the URL, revalidating it by ETag if stale."""
+    page_observation, etag = page_cache.lookup(url, scope)
+    if page_observation is not None or etag is None:
+        return page_observation
+    # A conditional request is far cheaper than rendering the page again.
+    response = await context.request.get(url, headers={"If-None-Match": etag})
+    if response.status == 304:
+        return page_cache.revalidated(url, response.headers, scope)
+    return None
+
+
+
+async def start_interactive_session(url: str, websocket: WebSocket,
+                                    batch_window_ms: int = BATCH_WINDOW_MS, batch_max_events: int = BATCH_MAX_EVENTS,
+                                    encoding: str = "json", record_options: dict | None = None,
+                                    sinks: list | None = None, headless: bool = False,
+                                    screencast_options: dict | None = None):
     """
-    Launches a browser, injects rrweb, and streams DOM events
-    back over the provided WebSocket connection.
+    Opens a page on the shared recording browser, injects rrweb, and streams
+    DOM events back over the provided WebSocket connection. Sessions idle for
+    RECORDER_IDLE_TIMEOUT seconds are closed.
+
+    Events are sent in batches: each WebSocket frame is an array of rrweb
+    events collected over `batch_window_ms` (or until `batch_max_events`),
+    encoded as JSON text by default or in one of the binary WIRE_ENCODINGS.
+    `record_options` are passed through to `rrweb.record()` (see
+    `recorder.rrweb_record_options`). Every event is also handed to each of
+    `sinks` (objects with a synchronous `add(event)`) before batching, so they
+    see the full stream even when a slow client makes the batcher shed events.
+
+    With `headless=True` no display is needed: the page is streamed to the
+    client as a CDP screencast (`screencast_options` are passed to
+    `recorder.Screencast`) and the client drives the page by sending input
+    messages over the same socket (see `recorder.forward_client_input`).
     """
     print(f"--- Recorder Tool: Starting interactive session for URL: {url} ---")
     try:
-        with open("rrweb.js", "r") as f:
-            rrweb_script_content = f.read()
+        recorder_script = load_recorder_script()
     except FileNotFoundError:
         await websocket.send_text(json.dumps({"error": "rrweb.js not found on server"}))
         return
+    try:
+        encode_frame = make_frame_encoder(encoding)
+    except ValueError as e:
+        await websocket.send_text(json.dumps({"error": str(e)}))
+        return
+
+    async def send_frame(batch: list) -> int:
+        frame = encode_frame(batch)
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+            return len(frame)
+        await websocket.send_text(frame)
+        return len(frame.encode("utf-8"))
+
+    async def send_message(message: dict) -> int:
+        text = json.dumps(message)
+        await websocket.send_text(text)
+        return len(text)
+
+    batcher = EventBatcher(send_frame, window_ms=batch_window_ms, max_events=batch_max_events)
+    flusher = asyncio.create_task(batcher.run())
+    recording_metrics["active_sessions"] += 1
+    recording_metrics["sessions"] += 1
+
+    # Sessions share one long-lived browser per mode, each in its own context.
+    browsers = recording_browsers["headless" if headless else "headed"]
+    session_id = f"recording-{uuid.uuid4().hex}"
+    last_activity = time.monotonic()
+
+    async def reap_when_idle():
+        # Ends sessions nobody is using so they don't hold a slot forever.
+        while time.monotonic() - last_activity < RECORDER_IDLE_TIMEOUT:
+            await asyncio.sleep(min(RECORDER_IDLE_TIMEOUT, 30))
+        print(f"--- Recorder Tool: Session idle for {RECORDER_IDLE_TIMEOUT:.0f}s, closing it. ---")
+
+    async def receive_client_input() -> str:
+        nonlocal last_activity
+        message = await websocket.receive_text()
+        last_activity = time.monotonic()
+        return message
+
+    try:
+        async with browsers.page(session_id) as page:
+            background = {asyncio.create_task(reap_when_idle())}
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+            # Called from the page for every rrweb event; only buffers it.
+            async def send_event_to_frontend(event):
+                nonlocal last_activity
+                last_activity = time.monotonic()
+                for sink in sinks or ():
+                    try:
+                        sink.add(event)
+                    except Exception as e:
+                        # A faulty sink must not stop the stream to the client.
+                        print(f"--- Recorder Tool: {type(sink).__name__} failed on an event: {e} ---")
+                batcher.add(event)
 
-        # This function will now send data over the websocket
-        async def send_event_to_frontend(event):
-            await websocket.send_text(json.dumps(event))
+            # Expose the function to the browser page
+            await page.expose_function("send_event_to_backend", send_event_to_frontend)
+            # Registered as init scripts so recording restarts on every navigation.
+            await page.add_init_script(record_options_script(record_options or {}))
+            await page.add_init_script(recorder_script)
 
-        # Expose the function to the browser page
-        await page.expose_function("send_event_to_backend", send_event_to_frontend)
+            await page.goto(url)
 
-        await page.goto(url)
-        await page.evaluate(rrweb_script_content)
-        await page.evaluate("""
-            rrweb.record({
-                emit(event) { window.send_event_to_backend(event); },
-            });
-        """)
-        
-        print(f"--- Recorder Tool: rrweb injected. Streaming events to WebSocket. ---")
-        
-        # Keep the session alive until the browser page is closed.
-        page.on("close", lambda: print(f"Browser closed for session on {url}."))
-        await page.wait_for_event("close")
+            screencast = None
+            if headless:
+                cdp = await page.context.new_cdp_session(page)
+                screencast = Screencast(cdp, send_message, **(screencast_options or {}))
+                await screencast.start()
+                # The client disconnecting ends the session.
+                background.add(asyncio.create_task(forward_client_input(cdp, receive_client_input)))
 
+            print(f"--- Recorder Tool: rrweb injected. Streaming events to WebSocket. ---")
 
+            # Keep the session alive until the browser page is closed or the
+            # client goes away (which makes the flusher or input reader stop).
+            page.on("close", lambda: print(f"Browser closed for session on {url}."))
+            page_closed = asyncio.create_task(page.wait_for_event("close", timeout=0))
+            await asyncio.wait({page_closed, flusher, *background}, return_when=asyncio.FIRST_COMPLETED)
+            page_closed.cancel()
+            for task in background:
+                task.cancel()
+            if screencast is not None:
+                await screencast.stop()
+                print(f"--- Recorder Tool: Sent {screencast.frames} screencast frames ({screencast.bytes / 1024:.1f} KiB) ---")
+    except BrowserBusyError as e:
+        await websocket.send_text(json.dumps({"error": f"Recording capacity reached: {e}"}))
+    finally:
+        await browsers.release(session_id)
+        batcher.close()
+        try:
+            await flusher
+        except Exception as e:
+            print(f"--- Recorder Tool: Stopped streaming: {e} ---")
+        stats = batcher.stats()
+        recording_metrics["active_sessions"] -= 1
+        for key in ("events", "frames", "bytes", "coalesced", "dropped"):
+            recording_metrics[key] += stats[key]
+        print(
+            f"--- Recorder Tool: Sent {stats['events']} events in {stats['frames']} frames "
+            f"({stats['frames_per_second']:.1f} frames/s, {stats['bytes_per_second'] / 1024:.1f} KiB/s); "
+            f"{stats['coalesced']} coalesced, {stats['dropped']} dropped ---"
+        )